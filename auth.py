@@ -1,14 +1,24 @@
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 from typing import Optional
+import os
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from database import get_db, User
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import User
+from replicas import get_read_db
+from lru import LRUCache
 
 SECRET_KEY = "your-secret-key"  # Change this in production!
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 1 week
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))
+# When enabled, get_current_user_id trusts a valid token without checking that
+# the user still exists.
+AUTH_TRUST_TOKEN = os.getenv("AUTH_TRUST_TOKEN", "").lower() in ("1", "true", "yes")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/Auth/login")
 
@@ -29,12 +39,41 @@ def verify_token(token: str):
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-def get_current_user(request: Request, db: Session = Depends(get_db)):
+# Detached copies of the User columns handlers read, keyed by user id.
+user_cache = LRUCache(USER_CACHE_SIZE, sizeof=lambda _: 1, ttl=USER_CACHE_TTL)
+
+def invalidate_user(user_id: str):
+    user_cache.pop(user_id)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    invalidate_user(target.id)
+
+def get_token_user_id(request: Request) -> str:
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    user_id = verify_token(token)
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    return verify_token(token)
+
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_read_db)):
+    user_id = get_token_user_id(request)
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    db_user = await db.scalar(select(User).where(User.id == user_id))
+    if not db_user:
         raise HTTPException(status_code=401, detail="User not found")
-    return user 
\ No newline at end of file
+    user = SimpleNamespace(id=db_user.id, name=db_user.name, email=db_user.email)
+    user_cache.put(user_id, user)
+    return user
+
+async def get_current_user_id(request: Request, db: AsyncSession = Depends(get_read_db)) -> str:
+    """For endpoints that only need the caller's id.
+
+    Served from the user cache, or straight from the token when
+    AUTH_TRUST_TOKEN is set, so it usually costs no query.
+    """
+    if AUTH_TRUST_TOKEN:
+        return get_token_user_id(request)
+    return (await get_current_user(request, db)).id
@@ -1,14 +1,109 @@
-from sqlalchemy import create_engine, Column, String, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import create_engine, event, make_url, Column, String, Integer, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from fastapi import Response
+import os
+import time
 import uuid
 import datetime
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./users.db"
+# Either a sync or an async URL may be given; request handlers always get the
+# async driver (aiosqlite / asyncpg), scripts and DDL use the blocking one.
+SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL", "sqlite+aiosqlite:///./users.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+# How long a write transaction waits for the single SQLite writer connection
+DB_WRITE_TIMEOUT = float(os.getenv("DB_WRITE_TIMEOUT", 30))
+# After a write, the client's reads go to the primary for this many seconds
+# (longer than the replicas' usual lag; see replicas.py)
+DB_READ_YOUR_WRITES_SECONDS = int(os.getenv("DB_READ_YOUR_WRITES_SECONDS", 10))
+READ_YOUR_WRITES_COOKIE = "db_primary_until"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Applied to every SQLite connection; set one to an empty string to keep SQLite's default.
+# WAL lets readers run alongside the (single) writer, and NORMAL sync is safe under WAL.
+SQLITE_PRAGMAS = {
+    name: value for name, value in {
+        "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT", "5000"),  # ms to wait for another process's lock; first, so the rest wait too
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+        "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-20000"),  # negative: KiB per connection
+    }.items() if value
+}
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(url: str) -> str:
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
+def sync_database_url(url: str) -> str:
+    url = make_url(url)
+    return url.set(drivername=url.get_backend_name()).render_as_string(hide_password=False)
+
+def apply_sqlite_pragmas(dbapi_connection, read_only: bool = False):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        # A read-only connection (?mode=ro) can't change the journal mode; it follows the file's
+        if not (read_only and name == "journal_mode"):
+            cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+def create_async_db_engine(url: str, single_writer: bool = False):
+    parsed = make_url(url)
+    kwargs = {"pool_pre_ping": True, "pool_recycle": DB_POOL_RECYCLE}
+    if parsed.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if single_writer:
+        kwargs.update(poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0, pool_timeout=DB_WRITE_TIMEOUT)
+    elif parsed.database not in (None, "", ":memory:"):
+        kwargs.update(poolclass=AsyncAdaptedQueuePool, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    async_engine = create_async_engine(async_database_url(url), **kwargs)
+    if parsed.get_backend_name() == "sqlite":
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            if single_writer:
+                # Let SQLAlchemy issue BEGIN itself (see on_begin) instead of the driver
+                dbapi_connection.isolation_level = None
+            apply_sqlite_pragmas(dbapi_connection, read_only=parsed.query.get("mode") == "ro")
+
+        if single_writer:
+            @event.listens_for(async_engine.sync_engine, "begin")
+            def on_begin(conn):
+                # Take the write lock up front: a deferred transaction that reads and then
+                # writes fails with "database is locked" if another process wrote in between
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+    return async_engine
+
+def create_async_write_engine(url: str):
+    """Engine for write transactions.
+
+    SQLite allows one writer at a time, so on SQLite this is a single
+    connection: write transactions queue for it in the pool (FIFO, up to
+    DB_WRITE_TIMEOUT) rather than spinning on the file lock, and other
+    processes wait out busy_timeout. Other databases share async_engine.
+    """
+    if make_url(url).get_backend_name() != "sqlite":
+        return async_engine
+    return create_async_db_engine(url, single_writer=True)
+
+def create_sync_db_engine(url: str):
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    sync_engine = create_engine(sync_database_url(url), connect_args={"check_same_thread": False} if is_sqlite else {})
+    if is_sqlite:
+        event.listen(sync_engine, "connect", lambda dbapi_connection, connection_record: apply_sqlite_pragmas(dbapi_connection))
+    return sync_engine
+
+async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async_write_engine = create_async_write_engine(SQLALCHEMY_DATABASE_URL)
+AsyncWriteSessionLocal = async_sessionmaker(async_write_engine, autoflush=False, expire_on_commit=False)
+
+engine = create_sync_db_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -23,6 +118,11 @@ class User(Base):
 
 class Resume(Base):
     __tablename__ = "resumes"
+    __table_args__ = (
+        Index("ix_resumes_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_resumes_public_city_salary_id", "isPublic", "city", "desiredSalary", "id"),
+        Index("ix_resumes_public_salary_id", "isPublic", "desiredSalary", "id"),
+    )
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"))
     user = relationship("User", backref="resumes")
@@ -49,6 +149,7 @@ class Resume(Base):
     driverLicenses = Column(String, nullable=True)
     hasMedicalBook = Column(Boolean, nullable=True)
     personalQualities = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
     work_experiences = relationship("WorkExperience", back_populates="resume", cascade="all, delete-orphan")
     educations = relationship("Education", back_populates="resume", cascade="all, delete-orphan")
     photo = relationship("ResumePhoto", back_populates="resume", uselist=False)
@@ -61,7 +162,7 @@ class WorkExperience(Base):
     startDate = Column(DateTime, nullable=True)
     endDate = Column(DateTime, nullable=True)
     responsibilities = Column(String, nullable=True)
-    resume_id = Column(String, ForeignKey("resumes.id"))
+    resume_id = Column(String, ForeignKey("resumes.id"), index=True)
     resume = relationship("Resume", back_populates="work_experiences")
 
 class Education(Base):
@@ -72,7 +173,7 @@ class Education(Base):
     specialty = Column(String, nullable=True)
     graduationYear = Column(Integer, nullable=True)
     studyForm = Column(String, nullable=True)
-    resume_id = Column(String, ForeignKey("resumes.id"))
+    resume_id = Column(String, ForeignKey("resumes.id"), index=True)
     resume = relationship("Resume", back_populates="educations")
 
 class ResumeRequest(Base):
@@ -109,18 +210,46 @@ class ResumePhoto(Base):
     __tablename__ = "resume_photos"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     filename = Column(String, nullable=False)
-    resume_id = Column(String, ForeignKey("resumes.id"), nullable=True)
+    resume_id = Column(String, ForeignKey("resumes.id"), nullable=True, index=True)
     resume = relationship("Resume", back_populates="photo")
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
-# Create the database tables
-Base.metadata.create_all(bind=engine)
+class PdfJob(Base):
+    __tablename__ = "pdf_jobs"
+    __table_args__ = (Index("ix_pdf_jobs_user_id_dedup_key", "user_id", "dedup_key"),)
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    resume_id = Column(String, ForeignKey("resumes.id"), nullable=False, index=True)
+    theme = Column(String, nullable=False)
+    # Content hash of the resume and theme (see pdf_cache.resume_cache_key); identical pending jobs share it
+    dedup_key = Column(String, nullable=False, index=True)
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    result_path = Column(String, nullable=True)
+    available_at = Column(DateTime, default=datetime.datetime.utcnow)
+    locked_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+# Tables are created and altered by migrations (see migrate.py), not on import
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close() 
\ No newline at end of file
+
+def mark_recent_write(response: Response):
+    """Send the client's reads to the primary for a while, so it sees its own write."""
+    until = int(time.time()) + DB_READ_YOUR_WRITES_SECONDS
+    response.set_cookie(READ_YOUR_WRITES_COOKIE, str(until), max_age=DB_READ_YOUR_WRITES_SECONDS,
+                        httponly=True, samesite="lax")
+
+# Dependency for handlers that write; on SQLite their transactions are serialized (see create_async_write_engine).
+# Handlers that return a Response themselves must call mark_recent_write on it.
+async def get_write_db(response: Response):
+    mark_recent_write(response)
+    async with AsyncWriteSessionLocal() as db:
+        yield db 
\ No newline at end of file
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+import zipfile
+from typing import List
+
+from render_pool import render_cached, RenderQueueFull, PDF_POOL_SIZE, PDF_RETRY_AFTER
+
+EXPORT_MAX_RESUMES = int(os.getenv("EXPORT_MAX_RESUMES", 1000))
+EXPORT_CONCURRENCY = int(os.getenv("EXPORT_CONCURRENCY", PDF_POOL_SIZE))
+# How often an item waits for the render queue to drain before it is reported as failed
+EXPORT_BUSY_RETRIES = 5
+
+
+class _ZipSink:
+    """Write-only, unseekable file object that zipfile streams into.
+
+    Because it can't seek, zipfile writes data descriptors after each member
+    instead of patching headers, so every chunk can be sent as soon as it is
+    written.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _render_with_retry(resume_id, snapshot, theme) -> bytes:
+    for attempt in range(EXPORT_BUSY_RETRIES):
+        try:
+            return await render_cached(resume_id, snapshot, theme)
+        except RenderQueueFull:
+            await asyncio.sleep(PDF_RETRY_AFTER * (attempt + 1))
+    raise RenderQueueFull()
+
+
+async def _render_worker(pending: asyncio.Queue, done: asyncio.Queue):
+    while True:
+        try:
+            resume_id, snapshot, theme = pending.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        try:
+            await done.put((resume_id, await _render_with_retry(resume_id, snapshot, theme), None))
+        except Exception as ex:
+            await done.put((resume_id, None, ex))
+
+
+async def stream_resume_zip(items: List[tuple], missing_ids: List[str], truncated: bool = False):
+    """Yield a ZIP of rendered PDFs as they finish.
+
+    ``items`` are ``(resume_id, snapshot, theme)`` tuples. Renders run
+    EXPORT_CONCURRENCY at a time and at most that many finished PDFs wait
+    for the client, so memory stays bounded however big the batch is.
+    ``manifest.json`` at the end lists every resume's status and whether
+    more resumes matched than EXPORT_MAX_RESUMES (``truncated``).
+    """
+    manifest = [{"id": resume_id, "status": "not_found"} for resume_id in missing_ids]
+    pending = asyncio.Queue()
+    for item in items:
+        pending.put_nowait(item)
+    done = asyncio.Queue(maxsize=EXPORT_CONCURRENCY)
+    workers = [asyncio.ensure_future(_render_worker(pending, done)) for _ in range(min(EXPORT_CONCURRENCY, len(items)))]
+
+    sink = _ZipSink()
+    try:
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+            for _ in range(len(items)):
+                resume_id, pdf_bytes, error = await done.get()
+                if error is not None:
+                    manifest.append({"id": resume_id, "status": "error", "error": type(error).__name__})
+                    continue
+                filename = f"resume_{resume_id}.pdf"
+                archive.writestr(filename, pdf_bytes)
+                manifest.append({"id": resume_id, "status": "ok", "file": filename})
+                yield sink.drain()
+            archive.writestr("manifest.json", json.dumps(
+                {"resumes": manifest, "truncated": truncated, "limit": EXPORT_MAX_RESUMES}, ensure_ascii=False, indent=2))
+        yield sink.drain()
+    finally:
+        # The client may disconnect mid-stream; don't keep rendering for nobody
+        for worker in workers:
+            worker.cancel()
@@ -0,0 +1,67 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+
+from database import Resume
+
+
+def public_resume_filter(
+    city: Optional[str] = None,
+    salary_min: Optional[int] = None,
+    salary_max: Optional[int] = None,
+    employment: Optional[str] = None,
+    work_schedule: Optional[str] = None,
+    can_relocate: Optional[bool] = None,
+):
+    """Public resumes matching the given fields, cheapest salary first and
+    resumes without a salary before all others.
+
+    Shaped for the composite indexes on resumes: ``(isPublic, city,
+    desiredSalary, id)`` when a city is given, ``(isPublic, desiredSalary,
+    id)`` otherwise; they also give the sort order, and the remaining fields
+    filter the index hits. ``scripts/explain_queries.py`` checks every
+    combination uses one of them without sorting.
+    """
+    query = select(Resume).where(Resume.isPublic == True)
+    if city:
+        query = query.where(Resume.city == city)
+    if salary_min is not None:
+        query = query.where(Resume.desiredSalary >= salary_min)
+    if salary_max is not None:
+        query = query.where(Resume.desiredSalary <= salary_max)
+    if employment:
+        query = query.where(Resume.employment == employment)
+    if work_schedule:
+        query = query.where(Resume.workSchedule == work_schedule)
+    if can_relocate is not None:
+        query = query.where(Resume.canRelocate == can_relocate)
+    return query.order_by(Resume.desiredSalary.asc().nulls_first(), Resume.id)
+
+
+def filter_cursor(resume) -> str:
+    salary = "" if resume.desiredSalary is None else resume.desiredSalary
+    return f"{salary},{resume.id}"
+
+
+def parse_filter_cursor(cursor: str) -> Tuple[Optional[int], str]:
+    """(desired salary, resume id) of the last resume of the previous page; ValueError if malformed."""
+    salary, resume_id = cursor.split(",", 1)
+    return (int(salary) if salary else None), resume_id
+
+
+def filter_pages(query, after: Optional[Tuple[Optional[int], str]] = None) -> List:
+    """The rows of a ``public_resume_filter`` query after ``after`` (a ``parse_filter_cursor`` result).
+
+    Each returned query starts from an index seek however deep the page is;
+    run them in turn until the page is full.
+    """
+    if after is None:
+        return [query]
+    salary, resume_id = after
+    if salary is None:
+        # A row value comparison is never true for a NULL salary: finish those by id, then the rest
+        return [
+            query.where(Resume.desiredSalary.is_(None), Resume.id > resume_id),
+            query.where(Resume.desiredSalary.isnot(None)),
+        ]
+    return [query.where(tuple_(Resume.desiredSalary, Resume.id) > tuple_(salary, resume_id))]
@@ -0,0 +1,63 @@
+import os
+import threading
+from typing import Optional
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+FONT_DIR = os.getenv("FONT_DIR", "")
+
+# TrueType files behind the font names the themes use
+FONT_FILES = {
+    "Arial": "Arial.ttf",
+    "TimesNewRoman": "Times New Roman.ttf",
+    "Georgia": "Georgia.ttf",
+}
+# Built-in PDF fonts used when a TrueType file is missing. They only cover
+# Latin-1, so Cyrillic text renders poorly, but the PDF is still produced.
+FALLBACK_FONTS = {
+    "Arial": "Helvetica",
+    "TimesNewRoman": "Times-Roman",
+    "Georgia": "Times-Roman",
+}
+
+_resolved = {}
+_lock = threading.Lock()
+
+
+def resolve_font(font_name: str) -> str:
+    """Register ``font_name`` on first use and return the name to draw with.
+
+    Each TrueType file is parsed once per process; pdfmetrics keeps the
+    parsed font, so every canvas afterwards shares it.
+    """
+    resolved = _resolved.get(font_name)
+    if resolved is not None:
+        return resolved
+    with _lock:
+        resolved = _resolved.get(font_name)
+        if resolved is None:
+            resolved = font_name
+            filename = FONT_FILES.get(font_name)
+            if filename:
+                try:
+                    pdfmetrics.registerFont(TTFont(font_name, os.path.join(FONT_DIR, filename)))
+                except Exception as ex:
+                    resolved = FALLBACK_FONTS[font_name]
+                    print(f"Font {font_name} unavailable ({ex}), using {resolved}")
+            _resolved[font_name] = resolved
+    return resolved
+
+
+def font_file(font_name: str) -> Optional[str]:
+    """TrueType file behind a resolved font name, or None for built-in PDF fonts."""
+    filename = FONT_FILES.get(font_name)
+    if filename is None or _resolved.get(font_name) != font_name:
+        return None
+    return os.path.join(FONT_DIR, filename)
+
+
+def preload_fonts():
+    """Register every theme font now, e.g. before forking render workers."""
+    for font_name in FONT_FILES:
+        resolve_font(font_name)
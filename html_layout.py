@@ -0,0 +1,90 @@
+"""HTML backend: a computed resume layout as one inline SVG per page.
+
+SVG keeps the exact positions and text baselines of the PDF while the text
+stays selectable and searchable in the browser.
+"""
+import base64
+from html import escape
+
+from layout import ResumeLayout, Text, Rect, Line, Photo, rgb, normalized_rect
+from pdf import get_plan, layout_resume
+
+# Fallback stacks for the registered font names (see fonts.py)
+CSS_FONTS = {
+    "Arial": "Arial, Helvetica, sans-serif",
+    "Helvetica": "Helvetica, Arial, sans-serif",
+    "TimesNewRoman": "'Times New Roman', Times, serif",
+    "Times-Roman": "'Times New Roman', Times, serif",
+    "Georgia": "Georgia, 'Times New Roman', serif",
+}
+
+PAGE_STYLE = (
+    "body{margin:0;background:#eee}"
+    ".page{display:block;margin:16px auto;background:#fff;box-shadow:0 1px 4px rgba(0,0,0,.3)}"
+)
+
+
+def _color(color) -> str:
+    return "#%02x%02x%02x" % rgb(color)
+
+
+def _photo_data_uri(path: str) -> str:
+    with open(path, "rb") as f:
+        data = base64.b64encode(f.read()).decode("ascii")
+    mime = "image/png" if path.lower().endswith(".png") else "image/jpeg"
+    return f"data:{mime};base64,{data}"
+
+
+def _svg_page(layout: ResumeLayout, index: int, photo_src) -> str:
+    height = layout.height
+    parts = [f'<svg class="page" xmlns="http://www.w3.org/2000/svg" width="{layout.width}pt" height="{height}pt" '
+             f'viewBox="0 0 {layout.width} {height}">']
+    for n, el in enumerate(layout.pages[index]):
+        kind = type(el)
+        if kind is Text:
+            family = CSS_FONTS.get(el.font[0], "sans-serif")
+            parts.append(f'<text x="{el.x:.2f}" y="{height - el.y:.2f}" font-family="{escape(family)}" '
+                         f'font-size="{el.font[1]}" fill="{_color(el.color)}" xml:space="preserve">{escape(el.text)}</text>')
+        elif kind is Rect:
+            left, bottom, right, top = normalized_rect(el)
+            fill = _color(el.fill) if el.fill is not None else "none"
+            stroke = f' stroke="{_color(el.stroke)}"' if el.stroke is not None else ""
+            parts.append(f'<rect x="{left:.2f}" y="{height - top:.2f}" width="{right - left:.2f}" '
+                         f'height="{top - bottom:.2f}" fill="{fill}"{stroke}/>')
+        elif kind is Line:
+            parts.append(f'<line x1="{el.x1:.2f}" y1="{height - el.y1:.2f}" x2="{el.x2:.2f}" y2="{height - el.y2:.2f}" '
+                         f'stroke="{_color(el.color)}" stroke-width="{max(el.thickness, 0.5)}"/>')
+        elif kind is Photo:
+            try:
+                src = photo_src(el.path)
+            except OSError as ex:
+                print(f"Ошибка загрузки фото: {ex}")
+                continue
+            x, y = el.x, height - el.y - el.height
+            border = _color(el.border_color)
+            if el.is_circular:
+                cx, cy, r = x + el.width / 2, y + el.height / 2, min(el.width, el.height) / 2
+                clip_id = f"photo-{index}-{n}"
+                parts.append(f'<clipPath id="{clip_id}"><circle cx="{cx}" cy="{cy}" r="{r}"/></clipPath>')
+                parts.append(f'<image href="{escape(src)}" x="{x}" y="{y}" width="{el.width}" height="{el.height}" '
+                             f'preserveAspectRatio="xMidYMid slice" clip-path="url(#{clip_id})"/>')
+                parts.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="none" stroke="{border}"/>')
+            else:
+                parts.append(f'<image href="{escape(src)}" x="{x}" y="{y}" width="{el.width}" height="{el.height}" '
+                             f'preserveAspectRatio="xMidYMid slice"/>')
+                parts.append(f'<rect x="{x}" y="{y}" width="{el.width}" height="{el.height}" fill="none" stroke="{border}"/>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def render_html(layout: ResumeLayout, title: str = "", photo_src=_photo_data_uri) -> str:
+    """A standalone HTML document; ``photo_src`` maps a photo path to an image URL (inline data by default)."""
+    pages = "\n".join(_svg_page(layout, index, photo_src) for index in range(len(layout.pages)))
+    return (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{escape(title)}</title>'
+            f"<style>{PAGE_STYLE}</style></head>\n<body>\n{pages}\n</body></html>\n")
+
+
+def render_resume_html(resume, style_name="modern", photo_base_path="photos", photo_src=_photo_data_uri) -> str:
+    layout = layout_resume(resume, get_plan(style_name), photo_base_path)
+    title = f"{resume.firstName} {resume.lastName}"
+    return render_html(layout, title, photo_src)
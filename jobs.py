@@ -0,0 +1,218 @@
+"""Persistent PDF render jobs.
+
+Jobs live in the ``pdf_jobs`` table, so they survive restarts and can be
+processed by any number of worker processes sharing the database:
+
+    python jobs.py --workers 4
+
+Workers claim jobs with a conditional UPDATE, retry failures with
+exponential backoff and periodically delete finished jobs older than
+PDF_JOB_RESULT_TTL together with their result files.
+"""
+import argparse
+import datetime
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Optional
+
+from sqlalchemy import select, update, delete, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from database import SessionLocal, PdfJob, Resume
+from pdf import render_resume_pdf, snapshot_resume
+from pdf_cache import pdf_cache, resume_cache_key
+
+PDF_JOB_RESULT_DIR = os.getenv("PDF_JOB_RESULT_DIR", "pdf_jobs")
+PDF_JOB_RESULT_TTL = int(os.getenv("PDF_JOB_RESULT_TTL", 24 * 60 * 60))
+PDF_JOB_MAX_ATTEMPTS = int(os.getenv("PDF_JOB_MAX_ATTEMPTS", 3))
+PDF_JOB_RETRY_BACKOFF = float(os.getenv("PDF_JOB_RETRY_BACKOFF", 5))
+# A running job whose worker hasn't finished it in this many seconds is assumed dead and re-queued
+PDF_JOB_LOCK_TIMEOUT = int(os.getenv("PDF_JOB_LOCK_TIMEOUT", 300))
+PDF_JOB_POLL_INTERVAL = float(os.getenv("PDF_JOB_POLL_INTERVAL", 1))
+PDF_JOB_CLEANUP_INTERVAL = int(os.getenv("PDF_JOB_CLEANUP_INTERVAL", 600))
+# Worker processes the API starts itself; 0 leaves processing to `python jobs.py`
+PDF_JOB_WORKERS = int(os.getenv("PDF_JOB_WORKERS", 0))
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("pending", "running")
+FINISHED_STATUSES = ("done", "failed")
+
+
+def _claimable(now: datetime.datetime):
+    stale = now - datetime.timedelta(seconds=PDF_JOB_LOCK_TIMEOUT)
+    return or_(
+        and_(PdfJob.status == "pending", PdfJob.available_at <= now),
+        and_(PdfJob.status == "running", PdfJob.locked_at < stale),
+    )
+
+
+async def enqueue_pdf_job(db: AsyncSession, user_id: str, resume_id: str, theme: str, dedup_key: str) -> PdfJob:
+    """Create a render job, or return an identical one that is queued, running or still has its result."""
+    existing = await db.scalar(
+        select(PdfJob)
+        .where(PdfJob.user_id == user_id, PdfJob.dedup_key == dedup_key, PdfJob.status.in_(ACTIVE_STATUSES + ("done",)))
+        .order_by(PdfJob.created_at.desc())
+    )
+    if existing and (existing.status != "done" or os.path.exists(existing.result_path or "")):
+        return existing
+    job = PdfJob(user_id=user_id, resume_id=resume_id, theme=theme, dedup_key=dedup_key)
+    db.add(job)
+    await db.commit()
+    return job
+
+
+async def discard_resume_jobs(db: AsyncSession, resume_id: str):
+    """Delete a resume's jobs and their result files; the caller commits."""
+    paths = (await db.scalars(select(PdfJob.result_path).where(PdfJob.resume_id == resume_id))).all()
+    await db.execute(delete(PdfJob).where(PdfJob.resume_id == resume_id))
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def claim_job(db: Session) -> Optional[PdfJob]:
+    now = datetime.datetime.utcnow()
+    candidates = db.scalars(select(PdfJob.id).where(_claimable(now)).order_by(PdfJob.created_at).limit(10)).all()
+    for job_id in candidates:
+        claimed = db.execute(
+            update(PdfJob)
+            .where(PdfJob.id == job_id, _claimable(now))
+            .values(status="running", locked_at=now, attempts=PdfJob.attempts + 1)
+        )
+        db.commit()
+        if claimed.rowcount == 1:
+            return db.get(PdfJob, job_id)
+    return None
+
+
+def _result_path(job_id: str) -> str:
+    return os.path.join(PDF_JOB_RESULT_DIR, f"{job_id}.pdf")
+
+
+def _write_result(job_id: str, data: bytes) -> str:
+    os.makedirs(PDF_JOB_RESULT_DIR, exist_ok=True)
+    path = _result_path(job_id)
+    fd, tmp_path = tempfile.mkstemp(dir=PDF_JOB_RESULT_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def process_job(db: Session, job: PdfJob):
+    job_id = job.id
+    attempts = job.attempts
+    try:
+        resume = db.scalar(
+            select(Resume)
+            .options(selectinload(Resume.work_experiences), selectinload(Resume.educations), selectinload(Resume.photo))
+            .where(Resume.id == job.resume_id)
+        )
+        if resume is None:
+            attempts = PDF_JOB_MAX_ATTEMPTS
+            raise LookupError("Resume not found")
+        snapshot = snapshot_resume(resume)
+        data = render_resume_pdf(snapshot, job.theme)
+        job.result_path = _write_result(job_id, data)
+        if pdf_cache.disk_dir:
+            # Shared with the API processes through the on-disk tier
+            pdf_cache.write_disk(job.resume_id, resume_cache_key(snapshot, job.theme), data)
+        job.status = "done"
+        job.error = None
+        job.finished_at = datetime.datetime.utcnow()
+        db.commit()
+    except Exception as ex:
+        db.rollback()
+        job = db.get(PdfJob, job_id)
+        if job is None:
+            # Deleted while rendering, along with its resume (see discard_resume_jobs): drop the result too
+            path = _result_path(job_id)
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        job.error = f"{type(ex).__name__}: {ex}"
+        job.locked_at = None
+        if max(attempts, job.attempts) >= PDF_JOB_MAX_ATTEMPTS:
+            job.status = "failed"
+            job.finished_at = datetime.datetime.utcnow()
+        else:
+            job.status = "pending"
+            delay = PDF_JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            job.available_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=delay)
+        db.commit()
+
+
+def cleanup_expired_jobs(db: Session, batch_size: int = 500) -> int:
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=PDF_JOB_RESULT_TTL)
+    expired = db.scalars(
+        select(PdfJob).where(PdfJob.status.in_(FINISHED_STATUSES), PdfJob.finished_at < cutoff).limit(batch_size)
+    ).all()
+    for job in expired:
+        if job.result_path and os.path.exists(job.result_path):
+            os.remove(job.result_path)
+        db.delete(job)
+    db.commit()
+    return len(expired)
+
+
+def run_worker(poll_interval: float = PDF_JOB_POLL_INTERVAL, stop_event=None):
+    last_cleanup = 0.0
+    while stop_event is None or not stop_event.is_set():
+        # Nothing restarts a worker, so an error in one job or cleanup must not end the loop;
+        # a job left running is claimed again after PDF_JOB_LOCK_TIMEOUT
+        try:
+            with SessionLocal() as db:
+                if time.monotonic() - last_cleanup > PDF_JOB_CLEANUP_INTERVAL:
+                    last_cleanup = time.monotonic()
+                    cleanup_expired_jobs(db)
+                job = claim_job(db)
+                if job is not None:
+                    process_job(db, job)
+                    continue
+        except Exception:
+            logger.exception("PDF job worker error")
+        time.sleep(poll_interval)
+
+
+def start_workers(count: int, poll_interval: float = PDF_JOB_POLL_INTERVAL):
+    # spawn, not fork: the parent may be a uvicorn process with running threads
+    ctx = multiprocessing.get_context("spawn")
+    stop_event = ctx.Event()
+    processes = [ctx.Process(target=run_worker, args=(poll_interval, stop_event), daemon=True) for _ in range(count)]
+    for process in processes:
+        process.start()
+    return stop_event, processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process queued PDF render jobs")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--poll-interval", type=float, default=PDF_JOB_POLL_INTERVAL)
+    parser.add_argument("--cleanup", action="store_true", help="delete expired jobs once and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        with SessionLocal() as db:
+            removed = 0
+            while (batch := cleanup_expired_jobs(db)):
+                removed += batch
+        print(f"Removed {removed} expired jobs")
+        return
+
+    stop_event, processes = start_workers(args.workers, args.poll_interval)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        stop_event.set()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
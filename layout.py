@@ -0,0 +1,73 @@
+"""Positioned elements of a laid-out resume.
+
+``pdf.layout_resume`` computes these once; the PDF, PNG and HTML backends
+only draw them. Coordinates are PDF points with the origin at the
+bottom-left corner of the page, and a text element's ``y`` is its baseline.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from reportlab.lib.colors import Color
+
+
+@dataclass(frozen=True)
+class Text:
+    x: float
+    y: float
+    font: Tuple[str, float]  # registered font name, size
+    color: Color
+    text: str
+
+
+@dataclass(frozen=True)
+class Rect:
+    x: float
+    y: float
+    width: float
+    height: float  # may be negative: the rect extends down from y
+    stroke: Optional[Color]
+    fill: Optional[Color]
+
+
+@dataclass(frozen=True)
+class Line:
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    color: Color
+    thickness: float
+
+
+@dataclass(frozen=True)
+class Photo:
+    path: str
+    x: float
+    y: float
+    width: float
+    height: float
+    is_circular: bool
+    border_color: Color
+
+
+@dataclass
+class ResumeLayout:
+    width: float
+    height: float
+    pages: List[list] = field(default_factory=lambda: [[]])
+
+    def add(self, page: int, element):
+        while len(self.pages) <= page:
+            self.pages.append([])
+        self.pages[page].append(element)
+
+
+def rgb(color: Color) -> Tuple[int, int, int]:
+    """0-255 RGB of a reportlab colour, for the raster and HTML backends."""
+    return tuple(int(round(channel * 255)) for channel in color.rgb())
+
+
+def normalized_rect(rect: Rect) -> Tuple[float, float, float, float]:
+    """(left, bottom, right, top) of a rect whatever the sign of its size."""
+    x2, y2 = rect.x + rect.width, rect.y + rect.height
+    return min(rect.x, x2), min(rect.y, y2), max(rect.x, x2), max(rect.y, y2)
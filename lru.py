@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by the total ``sizeof`` of its values.
+
+    With the default ``sizeof=len`` the budget is in bytes; pass
+    ``sizeof=lambda value: 1`` to bound the number of entries instead.
+    Entries older than ``ttl`` seconds are treated as missing.
+    ``on_evict(key, value)`` is called for entries pushed out to make room.
+    """
+
+    def __init__(self, max_size: int, sizeof: Callable = len, ttl: Optional[float] = None,
+                 on_evict: Optional[Callable] = None):
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        evicted = []
+        with self._lock:
+            self._remove(key)
+            if size > self.max_size:
+                return
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._entries[key] = (value, size, expires_at)
+            self.size += size
+            while self.size > self.max_size:
+                evicted_key, (evicted_value, evicted_size, _) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                evicted.append((evicted_key, evicted_value))
+        if self.on_evict is not None:
+            for evicted_key, evicted_value in evicted:
+                self.on_evict(evicted_key, evicted_value)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._remove(key)
+            return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "size": self.size, "max_size": self.max_size,
+                "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, key) -> Optional[tuple]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+        return entry
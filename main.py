@@ -1,18 +1,33 @@
 from fastapi import FastAPI, Depends, HTTPException, File, UploadFile, Path, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, delete, update, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
 from typing import Optional, List
 import os
+import uuid
 from datetime import datetime
 from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
 from fastapi import Response, Request
 from io import BytesIO
 
-from database import get_db, User, Resume, WorkExperience as DBWorkExperience, Education as DBEducation, ResumePhoto
-from security import get_password_hash, verify_password
+from database import get_db, get_write_db, mark_recent_write, AsyncWriteSessionLocal, User, Resume, WorkExperience as DBWorkExperience, Education as DBEducation, ResumePhoto, PdfJob
+from security import password_hasher, PasswordHasherBusy
 from pydantic import BaseModel, EmailStr, Field
-from auth import create_access_token, get_current_user
-from pdf import render_resume_pdf  # adjust import if needed
+from auth import create_access_token, get_current_user, get_current_user_id
+from pdf import STYLES, snapshot_resume
+from render_pool import render_pool, render_cached, RenderQueueFull, RenderTimeout, PDF_RETRY_AFTER
+from pdf_cache import pdf_cache, resume_cache_key, etag_matches
+from export import stream_resume_zip, EXPORT_MAX_RESUMES
+from prerender import prerenderer
+from search import update_search_index, remove_from_search_index, search_resumes, search_cursor, parse_search_cursor
+from filters import public_resume_filter, filter_pages, filter_cursor, parse_filter_cursor
+from preview import preview_cache, preview_cache_key, preview_cached, preview_width, PREVIEW_FORMATS, PREVIEW_MIN_WIDTH, PREVIEW_MAX_WIDTH
+from jobs import enqueue_pdf_job, discard_resume_jobs, start_workers, PDF_JOB_WORKERS
+from migrate import upgrade, check_schema, DB_AUTO_MIGRATE
+from replicas import get_read_db, read_replicas
+from photos import PHOTO_DIR, MAX_PHOTO_BYTES, PhotoTooLarge, InvalidPhoto, save_upload, derive_photo_variants, remove_photo_files
 
 app = FastAPI(
     title="FastAPI Backend",
@@ -27,15 +42,48 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor", "X-Export-Truncated"],
 )
 
+pdf_job_workers = None
+
+@app.on_event("startup")
+async def migrate_database():
+    if DB_AUTO_MIGRATE:
+        await run_in_threadpool(upgrade)
+    else:
+        await run_in_threadpool(check_schema)
+
+@app.on_event("startup")
+async def start_pdf_job_workers():
+    global pdf_job_workers
+    if PDF_JOB_WORKERS > 0:
+        pdf_job_workers = start_workers(PDF_JOB_WORKERS)
+
+@app.on_event("shutdown")
+async def shutdown_render_pool():
+    prerenderer.shutdown()
+    render_pool.shutdown()
+    password_hasher.shutdown()
+    await read_replicas.dispose()
+    if pdf_job_workers:
+        stop_event, processes = pdf_job_workers
+        stop_event.set()
+        for process in processes:
+            process.join(timeout=5)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to FastAPI Backend"}
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "passwordHashing": password_hasher.stats(), "readReplicas": read_replicas.stats()}
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse({"detail": "Too many authentication requests, try again later"}, status_code=503,
+                        headers={"Retry-After": "1"})
 
 class RegisterRequest(BaseModel):
     Name: str
@@ -142,31 +190,45 @@ class ResumeUpdate(BaseModel):
     personalQualities: Optional[str] = None
 
 @app.post("/api/Auth/register", response_model=UserResponse)
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == request.Email).first()
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_write_db)):
+    # Hash before the first query: that starts the write transaction, which shouldn't wait on bcrypt
+    hashed_password = await password_hasher.hash(request.Password)
+    db_user = await db.scalar(select(User).where(User.email == request.Email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(request.Password)
     db_user = User(
         name=request.Name,
         email=request.Email,
         password_hash=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    # Everything the response needs is on db_user already; reading it back would start another write transaction
+    await db.commit()
     access_token = create_access_token({"sub": db_user.id})
     response = JSONResponse(UserResponse(user=UserData.model_validate(db_user)).model_dump())
     response.set_cookie(key="access_token", value=access_token, httponly=True, samesite="lax")
+    mark_recent_write(response)
     return response
 
 @app.post("/api/Auth/login", response_model=UserResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter((User.email == request.Login) | (User.name == request.Login)).first()
-    if not db_user or not verify_password(request.Password, db_user.password_hash):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
+    db_user = await db.scalar(select(User).where((User.email == request.Login) | (User.name == request.Login)))
+    if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    access_token = create_access_token({"sub": db_user.id})
-    response = JSONResponse(UserResponse(user=UserData.model_validate(db_user)).model_dump())
+    user = UserData.model_validate(db_user)
+    password_hash = db_user.password_hash
+    # Give the connection back to the pool before bcrypt, which takes far longer than the query
+    await db.close()
+    valid, new_hash = await password_hasher.verify_and_update(request.Password, password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Only logins that rehash write, so they take a short write transaction of their own
+        async with AsyncWriteSessionLocal() as write_db:
+            await write_db.execute(update(User).where(User.id == user.id).values(password_hash=new_hash))
+            await write_db.commit()
+    access_token = create_access_token({"sub": user.id})
+    response = JSONResponse(UserResponse(user=user).model_dump())
     response.set_cookie(key="access_token", value=access_token, httponly=True, samesite="lax")
     return response
 
@@ -183,22 +245,27 @@ async def check_auth(user=Depends(get_current_user)):
     return UserResponse(user=UserData.model_validate(user))
 
 @app.put("/api/Resume/{id}/photo")
-async def upload_resume_photo(id: str, PhotoFile: UploadFile = File(...), user=Depends(get_current_user), db: Session = Depends(get_db)):
-    os.makedirs("photos", exist_ok=True)
-    filename = f"{id}_{PhotoFile.filename}"
-    file_location = os.path.join("photos", filename)
-    
-    with open(file_location, "wb") as f:
-        content = await PhotoFile.read()
-        f.write(content)
-    
+async def upload_resume_photo(id: str, PhotoFile: UploadFile = File(...), user_id: str = Depends(get_current_user_id), db: AsyncSession = Depends(get_write_db)):
+    os.makedirs(PHOTO_DIR, exist_ok=True)
+    # A fresh name per upload, so a rejected upload never clobbers the current photo
+    filename = f"{id}_{uuid.uuid4().hex[:8]}_{os.path.basename(PhotoFile.filename or 'photo')}"
+    file_location = os.path.join(PHOTO_DIR, filename)
+
+    try:
+        await save_upload(PhotoFile, file_location)
+    except PhotoTooLarge:
+        raise HTTPException(status_code=413, detail=f"Photo is larger than {MAX_PHOTO_BYTES} bytes")
+    try:
+        await run_in_threadpool(derive_photo_variants, file_location)
+    except InvalidPhoto:
+        await run_in_threadpool(remove_photo_files, file_location)
+        raise HTTPException(status_code=400, detail="Uploaded file is not a supported image")
+
     # Create or update photo record
-    db_photo = db.query(ResumePhoto).filter(ResumePhoto.resume_id == id).first()
+    db_photo = await db.scalar(select(ResumePhoto).where(ResumePhoto.resume_id == id))
     if db_photo:
-        # Delete old file if it exists
-        old_file_path = os.path.join("photos", db_photo.filename)
-        if os.path.exists(old_file_path):
-            os.remove(old_file_path)
+        # Delete old files
+        await run_in_threadpool(remove_photo_files, os.path.join(PHOTO_DIR, db_photo.filename))
         db_photo.filename = filename
     else:
         db_photo = ResumePhoto(
@@ -207,14 +274,17 @@ async def upload_resume_photo(id: str, PhotoFile: UploadFile = File(...), user=D
         )
         db.add(db_photo)
     
-    db.commit()
+    await db.commit()
+    await pdf_cache.invalidate(id)
+    await preview_cache.invalidate(id)
+    prerenderer.schedule(id)
     return {"detail": "Photo uploaded successfully", "filename": filename}
 
 @app.post("/api/Resume")
-async def create_resume(resume: ResumeRequest, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def create_resume(resume: ResumeRequest, db: AsyncSession = Depends(get_write_db), user_id: str = Depends(get_current_user_id)):
     db_resume = Resume(
         id=resume.id if resume.id else None,  # Use provided ID or let SQLAlchemy generate one
-        user_id=user.id,
+        user_id=user_id,
         title=resume.title,
         theme=resume.theme,
         isPublic=resume.isPublic,
@@ -239,39 +309,32 @@ async def create_resume(resume: ResumeRequest, db: Session = Depends(get_db), us
         hasMedicalBook=resume.hasMedicalBook,
         personalQualities=resume.personalQualities
     )
-    db.add(db_resume)
-    db.commit()
-    db.refresh(db_resume)
-
-    # Add work experiences
-    for we in resume.workExperiences:
-        db_we = DBWorkExperience(
+    # Add work experiences and educations; the relationship fills in resume_id when they are inserted
+    work_experiences = [
+        DBWorkExperience(
             organization=we.organization,
             position=we.workExpPosition,
             startDate=we.startDate,
             endDate=we.endDate,
             responsibilities=we.responsibilities,
-            resume_id=db_resume.id
-        )
-        db.add(db_we)
-    # Add educations
-    for edu in resume.educations:
-        db_edu = DBEducation(
+        ) for we in resume.workExperiences
+    ]
+    educations = [
+        DBEducation(
             institution=edu.institution,
             faculty=edu.faculty,
             specialty=edu.specialty,
             graduationYear=edu.graduationYear,
             studyForm=edu.studyForm,
-            resume_id=db_resume.id
-        )
-        db.add(db_edu)
-    db.commit()
-    db.refresh(db_resume)
-
-    # Fetch with relationships
-    db_resume = db.query(Resume).filter(Resume.id == db_resume.id).first()
-    work_experiences = db.query(DBWorkExperience).filter(DBWorkExperience.resume_id == db_resume.id).all()
-    educations = db.query(DBEducation).filter(DBEducation.resume_id == db_resume.id).all()
+        ) for edu in resume.educations
+    ]
+    db_resume.work_experiences = work_experiences
+    db_resume.educations = educations
+    db.add(db_resume)
+    await update_search_index(db, db_resume)
+    # One transaction, and nothing is read back after it: the response is built from the objects above
+    await db.commit()
+    prerenderer.schedule(db_resume.id)
 
     # Prepare response
     response = {
@@ -321,8 +384,8 @@ async def create_resume(resume: ResumeRequest, db: Session = Depends(get_db), us
     return response
 
 @app.put("/api/Resume/{id}")
-async def update_resume(id: str = Path(...), resume_update: ResumeUpdate = None, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    db_resume = db.query(Resume).filter(Resume.id == id, Resume.user_id == user.id).first()
+async def update_resume(id: str = Path(...), resume_update: ResumeUpdate = None, db: AsyncSession = Depends(get_write_db), user_id: str = Depends(get_current_user_id)):
+    db_resume = await db.scalar(select(Resume).where(Resume.id == id, Resume.user_id == user_id))
     if not db_resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
@@ -331,49 +394,55 @@ async def update_resume(id: str = Path(...), resume_update: ResumeUpdate = None,
     # Handle work experiences update
     if "workExperiences" in update_data:
         # Delete existing work experiences
-        db.query(DBWorkExperience).filter(DBWorkExperience.resume_id == id).delete()
+        await db.execute(delete(DBWorkExperience).where(DBWorkExperience.resume_id == id))
         
         # Add new work experiences
-        for we in update_data["workExperiences"]:
-            db_we = DBWorkExperience(
+        work_experiences = [
+            DBWorkExperience(
                 organization=we.get("organization"),
                 position=we.get("workExpPosition"),
                 startDate=we.get("startDate"),
                 endDate=we.get("endDate"),
                 responsibilities=we.get("responsibilities"),
                 resume_id=id
-            )
-            db.add(db_we)
+            ) for we in update_data["workExperiences"]
+        ]
+        db.add_all(work_experiences)
         del update_data["workExperiences"]
+    else:
+        work_experiences = (await db.scalars(select(DBWorkExperience).where(DBWorkExperience.resume_id == id))).all()
 
     # Handle educations update
     if "educations" in update_data:
         # Delete existing educations
-        db.query(DBEducation).filter(DBEducation.resume_id == id).delete()
+        await db.execute(delete(DBEducation).where(DBEducation.resume_id == id))
         
         # Add new educations
-        for edu in update_data["educations"]:
-            db_edu = DBEducation(
+        educations = [
+            DBEducation(
                 institution=edu.get("institution"),
                 faculty=edu.get("faculty"),
                 specialty=edu.get("specialty"),
                 graduationYear=edu.get("graduationYear"),
                 studyForm=edu.get("studyForm"),
                 resume_id=id
-            )
-            db.add(db_edu)
+            ) for edu in update_data["educations"]
+        ]
+        db.add_all(educations)
         del update_data["educations"]
+    else:
+        educations = (await db.scalars(select(DBEducation).where(DBEducation.resume_id == id))).all()
 
     # Update other fields
     for field, value in update_data.items():
         setattr(db_resume, field, value)
+    await update_search_index(db, db_resume)
     
-    db.commit()
-    db.refresh(db_resume)
-
-    # Fetch with relationships
-    work_experiences = db.query(DBWorkExperience).filter(DBWorkExperience.resume_id == db_resume.id).all()
-    educations = db.query(DBEducation).filter(DBEducation.resume_id == db_resume.id).all()
+    # The response is built from what was loaded above; reading after the commit would start another write transaction
+    await db.commit()
+    await pdf_cache.invalidate(id)
+    await preview_cache.invalidate(id)
+    prerenderer.schedule(id)
 
     response = {
         "id": db_resume.id,
@@ -421,87 +490,364 @@ async def update_resume(id: str = Path(...), resume_update: ResumeUpdate = None,
     }
     return response
 
+RESUME_LIST_COLUMNS = (
+    "id", "user_id", "title", "theme", "isPublic", "lastName", "firstName", "middleName", "birthDate",
+    "phoneNumber", "email", "position", "employment", "desiredSalary", "workSchedule", "isReadyForTrips",
+    "city", "canRelocate", "citizenship", "gender", "hasChildren", "languages", "driverLicenses",
+    "hasMedicalBook", "personalQualities",
+)
+RESUME_LIST_CHILDREN = ("workExperiences", "educations")
+RESUME_SUMMARY_COLUMNS = ("id", "title", "theme", "isPublic", "lastName", "firstName", "position", "city")
+
+def work_experience_dict(we):
+    return {
+        "organization": we.organization,
+        "workExpPosition": we.position,
+        "startDate": we.startDate,
+        "endDate": we.endDate,
+        "responsibilities": we.responsibilities
+    }
+
+def education_dict(edu):
+    return {
+        "institution": edu.institution,
+        "faculty": edu.faculty,
+        "specialty": edu.specialty,
+        "graduationYear": edu.graduationYear,
+        "studyForm": edu.studyForm
+    }
+
+def parse_list_fields(fields: Optional[str], view: str):
+    if view == "summary":
+        return RESUME_SUMMARY_COLUMNS, ()
+    if not fields:
+        return RESUME_LIST_COLUMNS, RESUME_LIST_CHILDREN
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in RESUME_LIST_COLUMNS and f not in RESUME_LIST_CHILDREN]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    columns = ["id"] + [f for f in RESUME_LIST_COLUMNS if f in requested and f != "id"]
+    children = [f for f in RESUME_LIST_CHILDREN if f in requested]
+    return columns, children
+
+MY_RESUMES_PAGE_SIZE = 100
+
+def my_resumes_cursor(resume: Resume) -> str:
+    return f"{resume.created_at.isoformat()},{resume.id}"
+
+def parse_my_resumes_cursor(cursor: str):
+    try:
+        created_at, resume_id = cursor.split(",", 1)
+        return datetime.fromisoformat(created_at), resume_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @app.get("/api/Resume/my")
-async def get_my_resumes(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    resumes = db.query(Resume).filter(Resume.user_id == user.id).all()
+async def get_my_resumes(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """List the user's resumes, oldest first.
+
+    Without ``limit`` or ``cursor`` every resume is returned at once. With
+    either, pages of ``limit`` (default 100) are keyed on (created_at, id):
+    pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch
+    the next page. ``fields`` limits the selected columns
+    (``workExperiences``/``educations`` pull in the child rows) and
+    ``view=summary`` returns only the columns needed for a resume card.
+    """
+    columns, children = parse_list_fields(fields, view)
+    options = [load_only(*(getattr(Resume, c) for c in columns), Resume.created_at)]
+    if "workExperiences" in children:
+        options.append(selectinload(Resume.work_experiences))
+    if "educations" in children:
+        options.append(selectinload(Resume.educations))
+
+    query = (
+        select(Resume).options(*options).where(Resume.user_id == user_id)
+        .order_by(Resume.created_at, Resume.id)
+    )
+    if limit is None and cursor is None:
+        resumes = (await db.scalars(query)).all()
+    else:
+        limit = limit or MY_RESUMES_PAGE_SIZE
+        if cursor:
+            query = query.where(tuple_(Resume.created_at, Resume.id) > tuple_(*parse_my_resumes_cursor(cursor)))
+        resumes = (await db.scalars(query.limit(limit + 1))).all()
+        if len(resumes) > limit:
+            resumes = resumes[:limit]
+            response.headers["X-Next-Cursor"] = my_resumes_cursor(resumes[-1])
+
     result = []
     for r in resumes:
-        work_experiences = db.query(DBWorkExperience).filter(DBWorkExperience.resume_id == r.id).all()
-        educations = db.query(DBEducation).filter(DBEducation.resume_id == r.id).all()
-        result.append({
-            "id": r.id,
-            "user_id": r.user_id,
-            "title": r.title,
-            "theme": r.theme,
-            "isPublic": r.isPublic,
-            "lastName": r.lastName,
-            "firstName": r.firstName,
-            "middleName": r.middleName,
-            "birthDate": r.birthDate,
-            "phoneNumber": r.phoneNumber,
-            "email": r.email,
-            "position": r.position,
-            "employment": r.employment,
-            "desiredSalary": r.desiredSalary,
-            "workSchedule": r.workSchedule,
-            "isReadyForTrips": r.isReadyForTrips,
-            "city": r.city,
-            "canRelocate": r.canRelocate,
-            "citizenship": r.citizenship,
-            "gender": r.gender,
-            "hasChildren": r.hasChildren,
-            "languages": r.languages,
-            "driverLicenses": r.driverLicenses,
-            "hasMedicalBook": r.hasMedicalBook,
-            "personalQualities": r.personalQualities,
-            "workExperiences": [
-                {
-                    "organization": we.organization,
-                    "workExpPosition": we.position,
-                    "startDate": we.startDate,
-                    "endDate": we.endDate,
-                    "responsibilities": we.responsibilities
-                } for we in work_experiences
-            ],
-            "educations": [
-                {
-                    "institution": edu.institution,
-                    "faculty": edu.faculty,
-                    "specialty": edu.specialty,
-                    "graduationYear": edu.graduationYear,
-                    "studyForm": edu.studyForm
-                } for edu in educations
-            ]
-        })
+        item = {c: getattr(r, c) for c in columns}
+        if "workExperiences" in children:
+            item["workExperiences"] = [work_experience_dict(we) for we in r.work_experiences]
+        if "educations" in children:
+            item["educations"] = [education_dict(edu) for edu in r.educations]
+        result.append(item)
     return result
 
+class ResumeExportFilter(BaseModel):
+    city: Optional[str] = None
+    position: Optional[str] = None
+    onlyMine: Optional[bool] = False
+
+class ResumeExportRequest(BaseModel):
+    ids: Optional[List[str]] = None
+    filter: Optional[ResumeExportFilter] = None
+
+@app.post("/api/Resume/export")
+async def export_resumes(request: ResumeExportRequest, db: AsyncSession = Depends(get_read_db), user_id: str = Depends(get_current_user_id)):
+    """Stream a ZIP with the PDFs of the caller's and public resumes selected by ids or filter."""
+    query = (
+        select(Resume)
+        .options(selectinload(Resume.work_experiences), selectinload(Resume.educations), selectinload(Resume.photo))
+        .where(or_(Resume.user_id == user_id, Resume.isPublic == True))
+    )
+    if request.ids:
+        if len(request.ids) > EXPORT_MAX_RESUMES:
+            raise HTTPException(status_code=400, detail=f"At most {EXPORT_MAX_RESUMES} resumes per export")
+        query = query.where(Resume.id.in_(request.ids))
+    elif request.filter:
+        if request.filter.city:
+            query = query.where(Resume.city == request.filter.city)
+        if request.filter.position:
+            query = query.where(Resume.position == request.filter.position)
+        if request.filter.onlyMine:
+            query = query.where(Resume.user_id == user_id)
+    else:
+        raise HTTPException(status_code=400, detail="Provide ids or filter")
+
+    # One more than the limit tells whether the filter matched more than is exported
+    resumes = (await db.scalars(query.order_by(Resume.id).limit(EXPORT_MAX_RESUMES + 1))).all()
+    truncated = len(resumes) > EXPORT_MAX_RESUMES
+    resumes = resumes[:EXPORT_MAX_RESUMES]
+    items = [(r.id, snapshot_resume(r), r.theme or "modern") for r in resumes]
+    found = {r.id for r in resumes}
+    missing = [resume_id for resume_id in dict.fromkeys(request.ids or ()) if resume_id not in found]
+    headers = {"Content-Disposition": "attachment; filename=resumes.zip"}
+    if truncated:
+        headers["X-Export-Truncated"] = "true"
+    return StreamingResponse(stream_resume_zip(items, missing, truncated), media_type="application/zip", headers=headers)
+
+@app.get("/api/Resume/search")
+async def search_public_resumes(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    city: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Public resumes matching every word of ``q``, best match first; the last word may be a prefix.
+
+    Searches position, city, languages, personal qualities and work
+    experience. ``city`` narrows to an exact city. Pass the
+    ``X-Next-Cursor`` response header back as ``cursor`` for the next page.
+    """
+    try:
+        after = parse_search_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    hits = await search_resumes(db, q, city=city, limit=limit, after=after)
+    if len(hits) == limit:
+        response.headers["X-Next-Cursor"] = search_cursor(*hits[-1])
+    if not hits:
+        return []
+    columns = [getattr(Resume, c) for c in RESUME_SUMMARY_COLUMNS]
+    resumes = {r.id: r for r in (await db.scalars(
+        select(Resume).options(load_only(*columns)).where(Resume.id.in_([resume_id for resume_id, _ in hits]))
+    )).all()}
+    return [
+        {**{c: getattr(resumes[resume_id], c) for c in RESUME_SUMMARY_COLUMNS}, "score": score}
+        for resume_id, score in hits if resume_id in resumes
+    ]
+
+FILTER_COLUMNS = RESUME_SUMMARY_COLUMNS + ("desiredSalary", "employment", "workSchedule", "canRelocate")
+
+@app.get("/api/Resume/filter")
+async def filter_public_resumes(
+    response: Response,
+    city: Optional[str] = None,
+    salaryMin: Optional[int] = Query(None, ge=0),
+    salaryMax: Optional[int] = Query(None, ge=0),
+    employment: Optional[str] = None,
+    workSchedule: Optional[str] = None,
+    canRelocate: Optional[bool] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Public resumes matching every given field, lowest desired salary first.
+
+    Pages are keyed on (desiredSalary, id): pass the ``X-Next-Cursor``
+    response header back as ``cursor`` for the next page.
+    """
+    try:
+        after = parse_filter_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    query = public_resume_filter(city, salaryMin, salaryMax, employment, workSchedule, canRelocate)
+    query = query.options(load_only(*(getattr(Resume, c) for c in FILTER_COLUMNS)))
+    resumes = []
+    for page in filter_pages(query, after):
+        resumes += (await db.scalars(page.limit(limit - len(resumes)))).all()
+        if len(resumes) == limit:
+            break
+    if len(resumes) == limit:
+        response.headers["X-Next-Cursor"] = filter_cursor(resumes[-1])
+    return [{c: getattr(r, c) for c in FILTER_COLUMNS} for r in resumes]
+
 @app.delete("/api/Resume/{id}")
-async def delete_resume(id: str, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    db_resume = db.query(Resume).filter(Resume.id == id, Resume.user_id == user.id).first()
+async def delete_resume(id: str, db: AsyncSession = Depends(get_write_db), user_id: str = Depends(get_current_user_id)):
+    db_resume = await db.scalar(
+        select(Resume)
+        .options(selectinload(Resume.work_experiences), selectinload(Resume.educations), selectinload(Resume.photo))
+        .where(Resume.id == id, Resume.user_id == user_id)
+    )
     if not db_resume:
         raise HTTPException(status_code=404, detail="Resume not found")
-    db.delete(db_resume)
-    db.commit()
+    await discard_resume_jobs(db, id)
+    await remove_from_search_index(db, id)
+    await db.delete(db_resume)
+    await db.commit()
+    await pdf_cache.invalidate(id)
+    await preview_cache.invalidate(id)
     return {"detail": "Resume deleted successfully"}
 
 @app.get("/api/Resume/{id}/pdf")
-async def get_resume_pdf(id: str, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    db_resume = db.query(Resume).filter(Resume.id == id, Resume.user_id == user.id).first()
+async def get_resume_pdf(id: str, request: Request, db: AsyncSession = Depends(get_read_db), user_id: str = Depends(get_current_user_id)):
+    db_resume = await db.scalar(
+        select(Resume)
+        .options(selectinload(Resume.work_experiences), selectinload(Resume.educations), selectinload(Resume.photo))
+        .where(Resume.id == id, Resume.user_id == user_id)
+    )
+    if not db_resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    snapshot = snapshot_resume(db_resume)
+    theme = db_resume.theme or "modern"
+    # Hashing the photo reads the file, so it stays off the event loop
+    cache_key = await run_in_threadpool(resume_cache_key, snapshot, theme)
+    headers = {"ETag": f'"{cache_key}"', "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        pdf_bytes = await render_cached(id, snapshot, theme, cache_key)
+    except RenderQueueFull:
+        raise HTTPException(status_code=503, detail="PDF renderer is busy, try again later",
+                            headers={"Retry-After": str(PDF_RETRY_AFTER)})
+    except RenderTimeout:
+        raise HTTPException(status_code=504, detail="PDF rendering timed out")
+    headers["Content-Disposition"] = f"inline; filename=resume_{id}.pdf"
+    return StreamingResponse(BytesIO(pdf_bytes), media_type="application/pdf", headers=headers)
+
+class PdfJobRequest(BaseModel):
+    theme: Optional[str] = None
+
+def pdf_job_dict(job: PdfJob):
+    return {
+        "jobId": job.id,
+        "resumeId": job.resume_id,
+        "theme": job.theme,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+        "createdAt": job.created_at,
+        "finishedAt": job.finished_at,
+    }
+
+@app.post("/api/Resume/{id}/pdf/jobs", status_code=202)
+async def create_pdf_job(id: str, request: Optional[PdfJobRequest] = None, db: AsyncSession = Depends(get_write_db), user_id: str = Depends(get_current_user_id)):
+    """Queue a PDF render; poll ``/api/PdfJobs/{jobId}`` until it is done."""
+    db_resume = await db.scalar(
+        select(Resume)
+        .options(selectinload(Resume.work_experiences), selectinload(Resume.educations), selectinload(Resume.photo))
+        .where(Resume.id == id, Resume.user_id == user_id)
+    )
+    if not db_resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    theme = (request.theme if request else None) or db_resume.theme or "modern"
+    if theme not in STYLES:
+        raise HTTPException(status_code=400, detail=f"Unknown theme: {theme}")
+
+    dedup_key = await run_in_threadpool(resume_cache_key, snapshot_resume(db_resume), theme)
+    job = await enqueue_pdf_job(db, user_id, id, theme, dedup_key)
+    return pdf_job_dict(job)
+
+async def get_own_job(job_id: str, db: AsyncSession, user_id: str) -> PdfJob:
+    job = await db.scalar(select(PdfJob).where(PdfJob.id == job_id, PdfJob.user_id == user_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/PdfJobs/{job_id}")
+async def get_pdf_job(job_id: str, db: AsyncSession = Depends(get_read_db), user_id: str = Depends(get_current_user_id)):
+    return pdf_job_dict(await get_own_job(job_id, db, user_id))
+
+@app.get("/api/PdfJobs/{job_id}/result")
+async def get_pdf_job_result(job_id: str, db: AsyncSession = Depends(get_read_db), user_id: str = Depends(get_current_user_id)):
+    job = await get_own_job(job_id, db, user_id)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if not job.result_path or not os.path.exists(job.result_path):
+        raise HTTPException(status_code=404, detail="Job result has expired")
+    return FileResponse(job.result_path, media_type="application/pdf", filename=f"resume_{job.resume_id}.pdf")
+
+@app.get("/api/Resume/{id}/preview")
+async def get_resume_preview(
+    id: str,
+    request: Request,
+    width: int = Query(300, ge=PREVIEW_MIN_WIDTH, le=PREVIEW_MAX_WIDTH),
+    format: str = Query("webp", pattern="^(png|webp)$"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Image of the first page of the caller's own or a public resume, for resume cards.
+
+    ``width`` is rounded up to the next of PREVIEW_WIDTHS.
+    """
+    db_resume = await db.scalar(
+        select(Resume)
+        .options(selectinload(Resume.work_experiences), selectinload(Resume.educations), selectinload(Resume.photo))
+        .where(Resume.id == id, or_(Resume.user_id == user_id, Resume.isPublic == True))
+    )
     if not db_resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    pdf_bytes = render_resume_pdf(db_resume, getattr(db_resume, "theme", "modern"))
-    return StreamingResponse(BytesIO(pdf_bytes), media_type="application/pdf", headers={
-        "Content-Disposition": f"inline; filename=resume_{id}.pdf"
-    })
+    snapshot = snapshot_resume(db_resume)
+    theme = db_resume.theme or "modern"
+    width = preview_width(width)
+    key = preview_cache_key(snapshot, theme, width, format, await run_in_threadpool(resume_cache_key, snapshot, theme))
+    headers = {"ETag": f'"{key}"', "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        image = await preview_cached(id, snapshot, theme, width, format, key)
+    except RenderQueueFull:
+        raise HTTPException(status_code=503, detail="PDF renderer is busy, try again later",
+                            headers={"Retry-After": str(PDF_RETRY_AFTER)})
+    except RenderTimeout:
+        raise HTTPException(status_code=504, detail="Preview rendering timed out")
+    return Response(image, media_type=PREVIEW_FORMATS[format][1], headers=headers)
 
 @app.get("/api/Resume/{id}/photo")
-async def get_resume_photo(id: str, db: Session = Depends(get_db), user=Depends(get_current_user)):    
-    db_photo = db.query(ResumePhoto).filter(ResumePhoto.resume_id == id).first()
+async def get_resume_photo(id: str, db: AsyncSession = Depends(get_read_db), user_id: str = Depends(get_current_user_id)):    
+    db_photo = await db.scalar(select(ResumePhoto).where(ResumePhoto.resume_id == id))
     if not db_photo:
         raise HTTPException(status_code=404, detail="Photo not found")
     
-    file_path = os.path.join("photos", db_photo.filename)
+    file_path = os.path.join(PHOTO_DIR, db_photo.filename)
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Photo file not found")
     
@@ -0,0 +1,244 @@
+"""Versioned schema migrations.
+
+Each file in ``migrations/`` named ``NNNN_description.py`` is one migration.
+It defines ``upgrade(conn)``, which runs in a single transaction together
+with recording the version in ``schema_migrations``, and may define
+``backfill(bind)`` for data changes too large for one transaction. Backfills
+run after the schema change is committed, in batches (see
+``backfill_in_batches``), so the service keeps serving while they run; one
+that is interrupted is resumed by the next ``upgrade``. Migrations only go
+forward; write a new one to undo a change. Spell out the schema a migration
+creates (SQL or a Table copy, see 0001) instead of using the models in
+database.py, which keep changing after the migration is written.
+
+    python migrate.py upgrade [--to N]   # apply pending migrations and backfills
+    python migrate.py status
+    python migrate.py new "add resume views"
+
+Migrations are never applied on import: run ``upgrade`` before starting the
+app (or set ``DB_AUTO_MIGRATE=1`` for development).
+"""
+import argparse
+import datetime
+import importlib.util
+import os
+import re
+import time
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.orm import Session
+
+from database import engine
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+# Rows per backfill transaction and the pause between batches, so a backfill
+# holds locks briefly and leaves room for the service's own queries.
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", 1000))
+MIGRATION_BATCH_PAUSE = float(os.getenv("MIGRATION_BATCH_PAUSE", 0.05))
+# Apply pending migrations when the app starts; meant for development
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "0") == "1"
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+schema_migrations = Table(
+    "schema_migrations", MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+    # Null while the migration's backfill still has to run
+    Column("backfilled_at", DateTime, nullable=True),
+)
+
+
+class Migration:
+    def __init__(self, version: int, name: str, path: str):
+        self.version = version
+        self.name = name
+        self.path = path
+        self._module = None
+
+    @property
+    def module(self):
+        if self._module is None:
+            spec = importlib.util.spec_from_file_location(f"migrations.m{self.version:04d}_{self.name}", self.path)
+            self._module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(self._module)
+        return self._module
+
+    @property
+    def has_backfill(self) -> bool:
+        return hasattr(self.module, "backfill")
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def applied_migrations(bind) -> dict:
+    """version -> schema_migrations row of every applied migration."""
+    schema_migrations.create(bind, checkfirst=True)
+    with bind.connect() as conn:
+        return {row.version: row for row in conn.execute(select(schema_migrations))}
+
+
+def pending_migrations(bind, migrations: Optional[List[Migration]] = None) -> List[Migration]:
+    applied = applied_migrations(bind)
+    return [m for m in (migrations or load_migrations()) if m.version not in applied]
+
+
+def upgrade(bind=engine, target: Optional[int] = None, run_backfills: bool = True, log: Callable = print):
+    """Apply pending migrations up to ``target`` (default: all), then any unfinished backfills."""
+    migrations = [m for m in load_migrations() if target is None or m.version <= target]
+    applied = applied_migrations(bind)
+    for migration in migrations:
+        if migration.version in applied:
+            continue
+        log(f"Applying {migration.version:04d}_{migration.name}")
+        now = datetime.datetime.utcnow()
+        with bind.begin() as conn:
+            migration.module.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version, name=migration.name, applied_at=now,
+                backfilled_at=None if migration.has_backfill else now,
+            ))
+    if not run_backfills:
+        return
+    for version, row in sorted(applied_migrations(bind).items()):
+        if row.backfilled_at is not None:
+            continue
+        migration = next((m for m in migrations if m.version == version), None)
+        if migration is None:
+            continue
+        log(f"Backfilling {migration.version:04d}_{migration.name}")
+        migration.module.backfill(bind)
+        with bind.begin() as conn:
+            conn.execute(schema_migrations.update().where(schema_migrations.c.version == version)
+                         .values(backfilled_at=datetime.datetime.utcnow()))
+
+
+def backfill_in_batches(bind, table: str, key: str, process_batch: Callable[[Session, Sequence], None],
+                        where: Optional[str] = None, batch_size: Optional[int] = None,
+                        pause: Optional[float] = None, log: Callable = print) -> int:
+    """Call ``process_batch(db, keys)`` for every row of ``table`` in ``key`` order.
+
+    Walks the table by key rather than by offset, commits after every batch
+    and sleeps ``pause`` seconds in between. ``where`` is an extra SQL
+    condition on the rows to visit. Returns the number of rows processed.
+    """
+    batch_size = batch_size or MIGRATION_BATCH_SIZE
+    pause = MIGRATION_BATCH_PAUSE if pause is None else pause
+    condition = f" AND ({where})" if where else ""
+    processed, last = 0, None
+    while True:
+        after = "1 = 1" if last is None else f'"{key}" > :last'
+        query = text(f'SELECT "{key}" FROM "{table}" WHERE {after}{condition} ORDER BY "{key}" LIMIT :limit')
+        with Session(bind) as db:
+            keys = db.scalars(query, {"last": last, "limit": batch_size}).all()
+            if not keys:
+                break
+            process_batch(db, keys)
+            db.commit()
+        processed += len(keys)
+        last = keys[-1]
+        log(f"  {table}: {processed} rows")
+        if len(keys) < batch_size:
+            break
+        time.sleep(pause)
+    return processed
+
+
+# Schema helpers for migrations; each is a no-op when the change is already there
+
+def create_index(conn, name: str, table_name: str, *column_names: str, unique: bool = False):
+    columns = ", ".join(f'"{c}"' for c in column_names)
+    conn.execute(text(f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS "{name}" ON "{table_name}" ({columns})'))
+
+
+def drop_index(conn, name: str):
+    conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+
+
+def add_column(conn, table_name: str, column: Column):
+    if column.name not in {c["name"] for c in inspect(conn).get_columns(table_name)}:
+        column_type = column.type.compile(conn.dialect)
+        default = conn.dialect.ddl_compiler(conn.dialect, None).get_column_default_string(column)
+        default = f" DEFAULT {default}" if default is not None else ""
+        conn.execute(text(f'ALTER TABLE "{table_name}" ADD COLUMN "{column.name}" {column_type}{default}'))
+
+
+def check_schema(bind=engine) -> List[Migration]:
+    """Pending migrations; warns about them so a stale schema is noticed at startup."""
+    pending = pending_migrations(bind)
+    if pending:
+        names = ", ".join(f"{m.version:04d}_{m.name}" for m in pending)
+        print(f"Database schema is behind: {names} pending; run `python migrate.py upgrade`")
+    return pending
+
+
+MIGRATION_TEMPLATE = '''"""{title}."""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    pass
+
+
+# Optional: data changes too large for one transaction
+# def backfill(bind):
+#     from migrate import backfill_in_batches
+#     backfill_in_batches(bind, "resumes", "id", lambda db, ids: ...)
+'''
+
+
+def new_migration(title: str, directory: str = MIGRATIONS_DIR) -> str:
+    version = max((m.version for m in load_migrations(directory)), default=0) + 1
+    slug = re.sub(r"\W+", "_", title.lower()).strip("_")
+    path = os.path.join(directory, f"{version:04d}_{slug}.py")
+    with open(path, "w") as f:
+        f.write(MIGRATION_TEMPLATE.format(title=title[:1].upper() + title[1:]))
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    commands = parser.add_subparsers(dest="command")
+    upgrade_parser = commands.add_parser("upgrade", help="apply pending migrations and backfills")
+    upgrade_parser.add_argument("--to", type=int, metavar="VERSION", help="stop after this version")
+    upgrade_parser.add_argument("--skip-backfill", action="store_true", help="only apply schema changes")
+    upgrade_parser.add_argument("--batch-size", type=int, help=f"rows per backfill batch (default: {MIGRATION_BATCH_SIZE})")
+    upgrade_parser.add_argument("--pause", type=float, help=f"seconds between batches (default: {MIGRATION_BATCH_PAUSE})")
+    commands.add_parser("status", help="list migrations and whether they are applied")
+    new_parser = commands.add_parser("new", help="create an empty migration")
+    new_parser.add_argument("title")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        applied = applied_migrations(engine)
+        for migration in load_migrations():
+            row = applied.get(migration.version)
+            if row is None:
+                state = "pending"
+            elif row.backfilled_at is None:
+                state = f"applied {row.applied_at:%Y-%m-%d %H:%M}, backfill pending"
+            else:
+                state = f"applied {row.applied_at:%Y-%m-%d %H:%M}"
+            print(f"{migration.version:04d}_{migration.name:<40} {state}")
+    elif args.command == "new":
+        print(f"Created {new_migration(args.title)}")
+    else:
+        # Migration modules import this file again as ``migrate``; hand the overrides over through the environment
+        if getattr(args, "batch_size", None):
+            os.environ["MIGRATION_BATCH_SIZE"] = str(args.batch_size)
+        if getattr(args, "pause", None) is not None:
+            os.environ["MIGRATION_BATCH_PAUSE"] = str(args.pause)
+        upgrade(engine, target=getattr(args, "to", None), run_backfills=not getattr(args, "skip_backfill", False))
+        print("Database schema is up to date")
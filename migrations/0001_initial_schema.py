@@ -0,0 +1,130 @@
+"""Tables that existed before migrations; on an existing database this is a no-op.
+
+The tables are copied here as they were declared at that point rather than
+taken from database.py, so later model changes (which come with their own
+migrations) don't change what this migration creates.
+"""
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, MetaData, String, Table
+
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("name", String, index=True),
+    Column("email", String, unique=True, index=True),
+    Column("password_hash", String),
+)
+
+Table(
+    "resumes", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("user_id", String, ForeignKey("users.id")),
+    Column("title", String),
+    Column("theme", String),
+    Column("isPublic", Boolean),
+    Column("lastName", String, nullable=False),
+    Column("firstName", String, nullable=False),
+    Column("middleName", String),
+    Column("birthDate", DateTime, nullable=False),
+    Column("phoneNumber", String),
+    Column("email", String, nullable=False),
+    Column("position", String, nullable=False),
+    Column("employment", String, nullable=False),
+    Column("desiredSalary", Integer),
+    Column("workSchedule", String, nullable=False),
+    Column("isReadyForTrips", Boolean),
+    Column("city", String, nullable=False),
+    Column("canRelocate", Boolean),
+    Column("citizenship", String, nullable=False),
+    Column("gender", String),
+    Column("hasChildren", Boolean),
+    Column("languages", String),
+    Column("driverLicenses", String),
+    Column("hasMedicalBook", Boolean),
+    Column("personalQualities", String),
+)
+
+Table(
+    "work_experiences", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("organization", String),
+    Column("position", String),
+    Column("startDate", DateTime),
+    Column("endDate", DateTime),
+    Column("responsibilities", String),
+    Column("resume_id", String, ForeignKey("resumes.id")),
+)
+
+Table(
+    "educations", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("institution", String),
+    Column("faculty", String),
+    Column("specialty", String),
+    Column("graduationYear", Integer),
+    Column("studyForm", String),
+    Column("resume_id", String, ForeignKey("resumes.id")),
+)
+
+Table(
+    "resume_requests", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("firstName", String, nullable=False),
+    Column("lastName", String, nullable=False),
+    Column("middleName", String),
+    Column("position", String, nullable=False),
+    Column("employment", String, nullable=False),
+    Column("desiredSalary", String),
+    Column("workSchedule", String, nullable=False),
+    Column("noPatronymic", Boolean),
+    Column("birthDate", String, nullable=False),
+    Column("phoneNumber", String),
+    Column("email", String, nullable=False),
+    Column("isReadyForTrips", Boolean),
+    Column("city", String, nullable=False),
+    Column("canRelocate", String),
+    Column("citizenship", String, nullable=False),
+    Column("maritalStatus", String),
+    Column("gender", String),
+    Column("hasChildren", Boolean),
+    Column("driverLicenses", String),
+    Column("hasMedicalBook", Boolean),
+    Column("photo", String),
+    Column("theme", String),
+    Column("languages", String),
+    Column("personalQualities", String),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+Table(
+    "resume_photos", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("filename", String, nullable=False),
+    Column("resume_id", String, ForeignKey("resumes.id")),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+Table(
+    "pdf_jobs", metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("user_id", String, ForeignKey("users.id"), nullable=False),
+    Column("resume_id", String, ForeignKey("resumes.id"), nullable=False),
+    Column("theme", String, nullable=False),
+    Column("dedup_key", String, nullable=False, index=True),
+    Column("status", String, nullable=False, index=True),
+    Column("attempts", Integer, nullable=False),
+    Column("error", String),
+    Column("result_path", String),
+    Column("available_at", DateTime),
+    Column("locked_at", DateTime),
+    Column("finished_at", DateTime),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(conn)
@@ -0,0 +1,13 @@
+"""Composite indexes for the resume list and filter queries, and resume_id on child tables."""
+from migrate import create_index
+
+
+def upgrade(conn):
+    create_index(conn, "ix_resumes_user_id_id", "resumes", "user_id", "id")
+    create_index(conn, "ix_resumes_public_city_salary", "resumes", "isPublic", "city", "desiredSalary")
+    create_index(conn, "ix_resumes_public_salary", "resumes", "isPublic", "desiredSalary")
+    create_index(conn, "ix_work_experiences_resume_id", "work_experiences", "resume_id")
+    create_index(conn, "ix_educations_resume_id", "educations", "resume_id")
+    create_index(conn, "ix_resume_photos_resume_id", "resume_photos", "resume_id")
+    create_index(conn, "ix_pdf_jobs_resume_id", "pdf_jobs", "resume_id")
+    create_index(conn, "ix_pdf_jobs_user_id_dedup_key", "pdf_jobs", "user_id", "dedup_key")
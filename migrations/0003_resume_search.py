@@ -0,0 +1,79 @@
+"""Full-text search tables, filled from the existing public resumes.
+
+The tables and the indexed text are spelled out here as search.py had them
+when this migration was written; see search.py for what they hold.
+"""
+import os
+
+from sqlalchemy import bindparam, text
+
+from migrate import backfill_in_batches
+
+# Configuration rather than schema: the index has to match what search.py queries with
+SEARCH_PG_CONFIG = os.getenv("SEARCH_PG_CONFIG", "simple")
+
+SQLITE_DDL = (
+    "CREATE TABLE IF NOT EXISTS resume_search_rows (id INTEGER PRIMARY KEY, resume_id VARCHAR NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS resume_search USING fts5("
+    "position, city, skills, experience, tokenize = 'unicode61 remove_diacritics 2', prefix = '3')",
+)
+POSTGRES_DDL = (
+    "CREATE TABLE IF NOT EXISTS resume_search (resume_id VARCHAR PRIMARY KEY, document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_resume_search_document ON resume_search USING GIN (document)",
+)
+
+SQLITE_INSERT = (
+    "DELETE FROM resume_search WHERE rowid = (SELECT id FROM resume_search_rows WHERE resume_id = :resume_id)",
+    "DELETE FROM resume_search_rows WHERE resume_id = :resume_id",
+    "INSERT INTO resume_search_rows (resume_id) VALUES (:resume_id)",
+    "INSERT INTO resume_search (rowid, position, city, skills, experience) VALUES "
+    "((SELECT id FROM resume_search_rows WHERE resume_id = :resume_id), :position, :city, :skills, :experience)",
+)
+POSTGRES_INSERT = (
+    "DELETE FROM resume_search WHERE resume_id = :resume_id",
+    "INSERT INTO resume_search (resume_id, document) VALUES (:resume_id, "
+    "setweight(to_tsvector(CAST(:config AS regconfig), :position), 'A') || "
+    "setweight(to_tsvector(CAST(:config AS regconfig), :skills), 'B') || "
+    "setweight(to_tsvector(CAST(:config AS regconfig), :city), 'C') || "
+    "setweight(to_tsvector(CAST(:config AS regconfig), :experience), 'D'))",
+)
+
+
+def upgrade(conn):
+    for statement in POSTGRES_DDL if conn.dialect.name == "postgresql" else SQLITE_DDL:
+        conn.execute(text(statement))
+
+
+def _join(*parts):
+    return " ".join(p for p in parts if p)
+
+
+def _index_batch(db, resume_ids):
+    ids = {"ids": list(resume_ids)}
+    resumes = db.execute(
+        text('SELECT id, position, city, languages, "personalQualities" FROM resumes WHERE id IN :ids')
+        .bindparams(bindparam("ids", expanding=True)), ids
+    ).all()
+    work_experiences = {}
+    for row in db.execute(
+        text("SELECT resume_id, position, organization, responsibilities FROM work_experiences WHERE resume_id IN :ids")
+        .bindparams(bindparam("ids", expanding=True)), ids
+    ):
+        work_experiences.setdefault(row.resume_id, []).append(row)
+    statements = POSTGRES_INSERT if db.bind.dialect.name == "postgresql" else SQLITE_INSERT
+    for resume in resumes:
+        experience = work_experiences.get(resume.id, [])
+        params = {
+            "resume_id": resume.id,
+            "config": SEARCH_PG_CONFIG,
+            "position": _join(resume.position, *(we.position for we in experience)),
+            "city": resume.city or "",
+            "skills": _join(resume.languages, resume.personalQualities),
+            "experience": _join(*(_join(we.organization, we.responsibilities) for we in experience)),
+        }
+        for statement in statements:
+            db.execute(text(statement), params)
+
+
+def backfill(bind):
+    backfill_in_batches(bind, "resumes", "id", _index_batch, where='"isPublic" = true')
@@ -0,0 +1,9 @@
+"""Add id to the filter indexes, so they also give the (desiredSalary, id) sort order."""
+from migrate import create_index, drop_index
+
+
+def upgrade(conn):
+    create_index(conn, "ix_resumes_public_city_salary_id", "resumes", "isPublic", "city", "desiredSalary", "id")
+    create_index(conn, "ix_resumes_public_salary_id", "resumes", "isPublic", "desiredSalary", "id")
+    drop_index(conn, "ix_resumes_public_city_salary")
+    drop_index(conn, "ix_resumes_public_salary")
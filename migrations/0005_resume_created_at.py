@@ -0,0 +1,34 @@
+"""resumes.created_at, for paging a user's resumes on (created_at, id).
+
+Resumes from before this migration get LEGACY_CREATED_AT, so they come
+first, in id order. It is the column's default: adding a column with a
+constant default doesn't rewrite the table, and no row is ever NULL.
+"""
+import datetime
+
+from sqlalchemy import Column, DateTime, bindparam, text
+
+from migrate import add_column, backfill_in_batches, create_index, drop_index
+
+LEGACY_CREATED_AT = datetime.datetime(1970, 1, 1)
+
+
+def upgrade(conn):
+    # Written the way SQLAlchemy stores datetimes in SQLite, so it compares equal to bound values
+    default = LEGACY_CREATED_AT.isoformat(" ", "microseconds")
+    add_column(conn, "resumes", Column("created_at", DateTime, server_default=default))
+    create_index(conn, "ix_resumes_user_id_created_at_id", "resumes", "user_id", "created_at", "id")
+    drop_index(conn, "ix_resumes_user_id_id")
+
+
+def _set_created_at(db, ids):
+    db.execute(
+        text('UPDATE resumes SET created_at = :created_at WHERE id IN :ids')
+        .bindparams(bindparam("created_at", type_=DateTime), bindparam("ids", expanding=True)),
+        {"created_at": LEGACY_CREATED_AT, "ids": list(ids)},
+    )
+
+
+def backfill(bind):
+    # Only finds rows on databases that added the column before it had a default
+    backfill_in_batches(bind, "resumes", "id", _set_created_at, where="created_at IS NULL")
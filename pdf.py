@@ -1,21 +1,22 @@
 # pdf_styles.py
 
 from reportlab.lib.colors import black, navy, darkblue, darkred, darkgreen, darkslategray, lightblue, palegreen, lightgrey, white, HexColor
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.utils import ImageReader
 from reportlab.lib import colors
+from PIL import Image, ImageDraw
 from io import BytesIO
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Optional, Tuple
 import os
 
 from database import Resume
-
-# Register fonts if needed (for custom fonts)
-pdfmetrics.registerFont(TTFont('Arial', 'Arial.ttf'))
-pdfmetrics.registerFont(TTFont('TimesNewRoman', 'Times New Roman.ttf'))
-pdfmetrics.registerFont(TTFont('Georgia', 'Georgia.ttf'))
+from fonts import resolve_font
+from layout import ResumeLayout, Text, Rect, Line, Photo
+from lru import LRUCache
+from textlayout import get_measurer
 
 class PhotoSettings:
     def __init__(self, width, height, x, y, is_circular):
@@ -188,522 +189,462 @@ def get_style(style_name: str) -> PdfStyle:
 def get_available_styles():
     return list(STYLES.keys())
 
-def increment_y(c, y, height, style, line_spacing):
-    y -= line_spacing
-    if y < style.margin_bottom + 100:
-        c.showPage()
-        y = height - style.margin_top
-    return y
+RESUME_FIELDS = (
+    "id", "title", "theme", "isPublic", "lastName", "firstName", "middleName", "birthDate",
+    "phoneNumber", "email", "position", "employment", "desiredSalary", "workSchedule",
+    "isReadyForTrips", "city", "canRelocate", "citizenship", "gender", "hasChildren",
+    "languages", "driverLicenses", "hasMedicalBook", "personalQualities",
+)
+WORK_EXPERIENCE_FIELDS = ("organization", "position", "startDate", "endDate", "responsibilities")
+EDUCATION_FIELDS = ("institution", "faculty", "specialty", "graduationYear", "studyForm")
+
+def snapshot_resume(resume: Resume) -> SimpleNamespace:
+    """Copy everything the renderer reads into plain, picklable objects.
+
+    The result can be handed to another process and no longer depends on the
+    SQLAlchemy session the resume was loaded from.
+    """
+    def copy(obj, fields):
+        return SimpleNamespace(**{f: getattr(obj, f) for f in fields})
+
+    snapshot = copy(resume, RESUME_FIELDS)
+    snapshot.work_experiences = [copy(we, WORK_EXPERIENCE_FIELDS) for we in resume.work_experiences]
+    snapshot.educations = [copy(edu, EDUCATION_FIELDS) for edu in resume.educations]
+    snapshot.photo = SimpleNamespace(filename=resume.photo.filename) if resume.photo else None
+    return snapshot
+
+def resolve_photo_path(filename: str, photo_base_path="photos") -> str:
+    if os.path.isabs(filename):
+        return filename
+    return os.path.join(photo_base_path, filename.lstrip("/"))
+
+# Photos are pre-scaled to the box each theme draws them in; two pixels per
+# point keeps them sharp when printed.
+PHOTO_PIXELS_PER_POINT = 2
+
+def derived_photo_path(photo_path: str, width, height) -> str:
+    """Path of the normalized JPEG for a photo drawn in a ``width`` x ``height`` point box."""
+    directory, filename = os.path.split(photo_path)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, "derived", f"{stem}.{int(width)}x{int(height)}.jpg")
+
+# Smaller output: photos embedded as their JPEG bytes. Circular photos are cut
+# by a clipping path instead of an alpha mask, which would force reportlab to
+# embed raw RGBA pixels. (Page content is compressed either way, reportlab's default.)
+PDF_OPTIMIZE = os.getenv("PDF_OPTIMIZE", "1") == "1"
+
+# Part of every cached render's key (see pdf_cache.resume_cache_key): bump it
+# whenever a change to the drawing code changes the output, so renders made by
+# the old code are no longer served.
+RENDER_VERSION = 1
+
+PHOTO_CACHE_MAX_BYTES = int(os.getenv("PHOTO_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+class CachedPhoto:
+    """A photo decoded once, plus its circular-mask variant once a theme asks for it."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.reader = ImageReader(BytesIO(data))
+        self.reader.getRGBData()  # ImageReader keeps the decoded pixels
+        self.circular = None
+
+    def build_circular(self):
+        img = Image.open(BytesIO(self.data)).convert("RGB")
+        mask = Image.new("L", img.size, 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, img.width - 1, img.height - 1), fill=255)
+        img.putalpha(mask)
+        self.circular = ImageReader(img)
+        self.circular.getRGBData()
+
+    @property
+    def nbytes(self) -> int:
+        width, height = self.reader.getSize()
+        pixels = width * height * 3
+        if self.circular is not None:
+            pixels += width * height * 4
+        return len(self.data) + pixels
+
+# Process-wide, so repeated renders in the same worker skip disk and decode work.
+photo_cache = LRUCache(PHOTO_CACHE_MAX_BYTES, sizeof=lambda photo: photo.nbytes)
+
+def load_photo(photo_path: str, circular: bool = False) -> ImageReader:
+    st = os.stat(photo_path)
+    key = (photo_path, st.st_mtime_ns, st.st_size)
+    photo = photo_cache.get(key)
+    if photo is None:
+        with open(photo_path, "rb") as f:
+            photo = CachedPhoto(f.read())
+        if circular:
+            photo.build_circular()
+        photo_cache.put(key, photo)
+    elif circular and photo.circular is None:
+        photo.build_circular()
+        photo_cache.put(key, photo)  # re-account the larger entry
+    return photo.circular if circular else photo.reader
+
+def _yes_no(value, yes="Да", no="Нет"):
+    return yes if value else no
+
+# One line per resume field: returns the text to draw, or None to skip the line.
+FIELD_ROWS = {
+    "middleName": lambda r: f"Отчество: {r.middleName}" if r.middleName else None,
+    "birthDate": lambda r: f"Дата рождения: {r.birthDate.strftime('%d.%m.%Y')}" if r.birthDate else None,
+    "phoneNumber": lambda r: f"Телефон: {r.phoneNumber}" if r.phoneNumber else None,
+    "email": lambda r: f"Email: {r.email}" if r.email else None,
+    "position": lambda r: f"Должность: {r.position}",
+    "employment": lambda r: f"Занятость: {r.employment}" if r.employment else None,
+    "desiredSalary": lambda r: f"Зарплата: {r.desiredSalary} руб." if r.desiredSalary else None,
+    "workSchedule": lambda r: f"График: {r.workSchedule}" if r.workSchedule else None,
+    "isReadyForTrips": lambda r: f"Командировки: {_yes_no(r.isReadyForTrips)}",
+    "isReadyForTripsKnown": lambda r: f"Командировки: {_yes_no(r.isReadyForTrips)}" if r.isReadyForTrips is not None else None,
+    "city": lambda r: f"Город: {r.city}",
+    "canRelocate": lambda r: f"Готов к переезду: {_yes_no(r.canRelocate)}",
+    "citizenship": lambda r: f"Гражданство: {r.citizenship}" if r.citizenship else None,
+    "gender": lambda r: f"Пол: {r.gender}" if r.gender else None,
+    "hasChildren": lambda r: f"Дети: {_yes_no(r.hasChildren, 'Есть', 'Нет')}",
+    "languages": lambda r: f"Языки: {r.languages}" if r.languages else None,
+    "driverLicenses": lambda r: f"Вод. права: {r.driverLicenses}" if r.driverLicenses else None,
+    "hasMedicalBook": lambda r: f"Мед. книжка: {_yes_no(r.hasMedicalBook, 'Есть', 'Нет')}",
+    "personalQualities": lambda r: f"Качества: {r.personalQualities}" if r.personalQualities else None,
+}
 
-def render_resume_pdf(resume: Resume, style_name="modern", photo_base_path="photos"):
-    style = get_style(style_name)
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
+PERSONAL_ROWS = ("city", "canRelocate", "citizenship", "gender", "hasChildren", "languages",
+                 "driverLicenses", "hasMedicalBook", "personalQualities")
+
+@dataclass(frozen=True)
+class SectionPlan:
+    title: str
+    kind: str  # "fields", "work_experiences" or "educations"
+    rows: Tuple[str, ...] = ()
+    bordered: bool = False
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    text_x: float
+    indent_x: float
+    box_x: float
+    box_width: float
+    box_height: Optional[float]  # fixed frame drawn once at the top of the column
+    text_width: float
+    sections: Tuple[SectionPlan, ...]
+
+@dataclass(frozen=True)
+class PhotoPlan:
+    x: float
+    y: float
+    width: float
+    height: float
+    is_circular: bool
+    next_y: float  # header offset from the top once the photo is drawn
+
+@dataclass(frozen=True)
+class LayoutPlan:
+    """Everything about a theme's geometry that does not depend on the resume."""
+    style: PdfStyle
+    # (registered font name, size), after falling back for missing font files
+    title_font: Tuple[str, float]
+    section_font: Tuple[str, float]
+    normal_font: Tuple[str, float]
+    width: float
+    height: float
+    line_spacing: float
+    margin_top: float
+    margin_left: float
+    accent: bool
+    photo: Optional[PhotoPlan]
+    header_line: Optional[Tuple[float, float]]
+    body_top: float
+    body_offset: float
+    page_bottom: float  # lowest top-offset a line may reach before breaking the page
+    columns: Tuple[ColumnPlan, ...]
+
+def compile_plan(style: PdfStyle) -> LayoutPlan:
     width, height = A4
+    deco = style.decoration_config
+    padding = 10 if deco.draw_section_borders else 0
+
+    photo = None
+    if style.photo_config:
+        pc = style.photo_config
+        if deco.draw_background_accent:
+            photo_y = height - 100 - pc.height // 2
+        else:
+            photo_y = height - pc.y - pc.height - style.margin_top
+        photo = PhotoPlan(pc.x, photo_y, pc.width, pc.height, pc.is_circular, height - photo_y + style.margin_top)
 
-    y = style.margin_top
-
-    # Draw background accent if configured
-    if style.decoration_config.draw_background_accent:
-        c.setFillColor(style.decoration_config.accent_color)
-        c.rect(0, height - 100, width, 100, fill=1)
-        c.setFillColor(style.text_color)  # Reset fill color back to text color
-
-    # Фото
-    if hasattr(resume, 'photo') and resume.photo and style.photo_config:
-        try:
-            photo_path = resume.photo.filename
-            if not os.path.isabs(photo_path):
-                photo_path = os.path.join(photo_base_path, photo_path.lstrip("/"))
-            if os.path.exists(photo_path):
-                img = ImageReader(photo_path)
-                photo_w = style.photo_config.width
-                photo_h = style.photo_config.height
-                photo_x = style.photo_config.x
-                if style.decoration_config.draw_background_accent:
-                    photo_y = height - 100 - photo_h // 2
-                else:
-                    photo_y = height - style.photo_config.y - photo_h - style.margin_top
-
-                print(photo_y, photo_h, height)
-                
-                if style.photo_config.is_circular:
-                    # Save graphics state
-                    c.saveState()
-                    
-                    # Draw circular background with border
-                    c.setFillColor(colors.white)
-                    c.setStrokeColor(style.decoration_config.line_color)
-                    c.setLineWidth(1)
-                    c.circle(photo_x + photo_w/2, photo_y + photo_h/2, min(photo_w, photo_h)/2, stroke=1, fill=1)
-                    
-                    # Create circular clip path
-                    p = c.beginPath()
-                    p.circle(photo_x + photo_w/2, photo_y + photo_h/2, min(photo_w, photo_h)/2)
-                    c.clipPath(p, stroke=0)
-                    
-                    # Draw image
-                    c.drawImage(img, photo_x, photo_y, photo_w, photo_h, mask='auto')
-                    
-                    # Restore graphics state
-                    c.restoreState()
-                else:
-                    # Draw rectangular background with border
-                    c.setFillColor(colors.white)
-                    c.setStrokeColor(style.decoration_config.line_color)
-                    c.setLineWidth(1)
-                    c.rect(photo_x, photo_y, photo_w, photo_h, stroke=1, fill=1)
-                    
-                    # Draw image
-                    c.drawImage(img, photo_x, photo_y, photo_w, photo_h, mask='auto')
-
-                # Update y position if photo extends below current y position
-                y = height - photo_y + style.margin_top
-
-                    
-        except Exception as ex:
-            print(f"Ошибка загрузки фото: {ex}")
-
-    # Заголовок
-    header = f"{resume.firstName} {resume.middleName or ''} {resume.lastName}"
-    c.setFont(style.title_font[0], style.title_font[1])
-    c.setFillColor(style.title_color)
-    c.drawString(style.margin_left, height - y, header)
-
-    y += style.line_spacing * 2
-
-    # Draw header line if configured
-    if style.decoration_config.draw_header_line:
-        c.setStrokeColor(style.decoration_config.line_color)
-        c.setLineWidth(style.decoration_config.line_thickness)
-        c.line(style.margin_left, height - y, width - style.margin_right, height - y)
-        c.setStrokeColor(style.text_color)  # Reset stroke color back to text color
-
-    y = max(y, 100 + style.line_spacing)
-
-    # Add padding for section borders if enabled
-    border_padding = 10 if style.decoration_config.draw_section_borders else 0
-
-    # Handle two-column layout if configured
     if style.use_two_columns:
-        # Store initial y position for left column
-        left_y = y
-    
-        # Calculate column widths and positions
         content_width = width - style.margin_left - style.margin_right
-        left_column_width = content_width * 0.35
-        right_column_width = content_width * 0.55
-        left_column_x = style.margin_left
-        right_column_x = style.margin_left + left_column_width + 20
-
-        # Draw section border for left column if configured
-        if style.decoration_config.draw_section_borders:
-            c.setStrokeColor(style.decoration_config.border_color)
-            c.rect(left_column_x, height - left_y - 350, left_column_width, 350)
-            c.setStrokeColor(style.text_color)  # Reset stroke color
-        
-        # Draw contact section in left column
-        c.setFont(style.section_font[0], style.section_font[1])
-        c.setFillColor(style.title_color)
-        c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, "Контакты")
-        left_y += style.line_spacing
-
-        # Draw phone number if available
-        if resume.phoneNumber:
-            c.setFont(style.normal_font[0], style.normal_font[1]) 
-            c.setFillColor(style.text_color)
-            c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Телефон: {resume.phoneNumber}")
-            left_y += style.line_spacing
-
-        # Draw email if available
-        if resume.email:
-            c.setFont(style.normal_font[0], style.normal_font[1])
-            c.setFillColor(style.text_color)
-            c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Email: {resume.email}")
-            left_y += style.line_spacing
-
-        left_y += style.line_spacing
-
-        # Draw personal information section
-        c.setFont(style.section_font[0], style.section_font[1])
-        c.setFillColor(style.title_color)
-        c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, "Личная информация")
-        left_y += style.line_spacing
-
-        # Draw personal details
-        c.setFont(style.normal_font[0], style.normal_font[1])
-        c.setFillColor(style.text_color)
-
-        c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Город: {resume.city}")
-        left_y += style.line_spacing
-
-        c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Готов к переезду: {'Да' if resume.canRelocate else 'Нет'}")
-        left_y += style.line_spacing
-
-        if resume.citizenship:
-            c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Гражданство: {resume.citizenship}")
-            left_y += style.line_spacing
-
-        if resume.gender:
-            c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Пол: {resume.gender}")
-            left_y += style.line_spacing
-
-        c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Дети: {'Есть' if resume.hasChildren else 'Нет'}")
-        left_y += style.line_spacing
-
-        if resume.languages:
-            c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Языки: {resume.languages}")
-            left_y += style.line_spacing
-
-        if resume.driverLicenses:
-            c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Вод. права: {resume.driverLicenses}")
-            left_y += style.line_spacing
-
-        c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Мед. книжка: {'Есть' if resume.hasMedicalBook else 'Нет'}")
-        left_y += style.line_spacing
-
-        if resume.personalQualities:
-            c.drawString(left_column_x + border_padding, height - left_y - style.line_spacing, f"Качества: {resume.personalQualities}")
-            left_y += style.line_spacing
-
-        # Draw right column
-        right_y = y
-
-        # Draw section border if enabled
-        if style.decoration_config.draw_section_borders:
-            c.setStrokeColor(style.decoration_config.border_color)
-            c.rect(right_column_x, height - right_y - 450, right_column_width, 450)
-
-        # Draw main information section
-        c.setFont(style.section_font[0], style.section_font[1])
-        c.setFillColor(style.title_color)
-        c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, "Основная информация")
-        right_y += style.line_spacing
-
-        # Draw position
-        c.setFont(style.normal_font[0], style.normal_font[1])
-        c.setFillColor(style.text_color)
-        c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, f"Должность: {resume.position}")
-        right_y += style.line_spacing
-
-        # Draw birth date if available
-        if resume.birthDate:
-            c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, f"Дата рождения: {resume.birthDate.strftime('%d.%m.%Y')}")
-            right_y += style.line_spacing
-
-        # Draw employment if available
-        if resume.employment:
-            c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, f"Занятость: {resume.employment}")
-            right_y += style.line_spacing
-
-        # Draw desired salary if available
-        if resume.desiredSalary:
-            c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, f"Зарплата: {resume.desiredSalary} руб.")
-            right_y += style.line_spacing
-
-        # Draw work schedule if available
-        if resume.workSchedule:
-            c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, f"График: {resume.workSchedule}")
-            right_y += style.line_spacing
-
-        # Draw business trips availability
-        if resume.isReadyForTrips is not None:
-            c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, f"Командировки: {'Да' if resume.isReadyForTrips else 'Нет'}")
-            right_y += style.line_spacing
-
-        # Add extra spacing
-        right_y += style.line_spacing
-
-        # Draw work experience section if available
-        if hasattr(resume, 'work_experiences') and resume.work_experiences:
-            # Draw section title
-            c.setFont(style.section_font[0], style.section_font[1])
-            c.setFillColor(style.title_color)
-            c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, "Опыт работы")
-            right_y += style.line_spacing
-
-            # Draw each work experience entry
-            c.setFont(style.normal_font[0], style.normal_font[1])
-            c.setFillColor(style.text_color)
-            
-            for exp in resume.work_experiences:
-                # Format period string
-                period = f"с {exp.startDate.strftime('%m.%Y')} по {exp.endDate.strftime('%m.%Y') if exp.endDate else 'настоящее время'}"
-                
-                # Draw organization, position and period
-                c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, 
-                           f"{exp.organization} - {exp.position} ({period})")
-                right_y += style.line_spacing
-
-                # Draw responsibilities with extra indent
-                if exp.responsibilities:
-                    c.drawString(right_column_x + border_padding + 10, height - right_y - style.line_spacing,
-                               exp.responsibilities)
-                    right_y += style.line_spacing * 1.5
-
-                right_y += style.line_spacing * 0.5
-
-            # Add extra spacing after work experience section
-            right_y += style.line_spacing
-
-        # Draw education section if available
-        if hasattr(resume, 'educations') and resume.educations:
-            # Draw section title
-            c.setFont(style.section_font[0], style.section_font[1])
-            c.setFillColor(style.title_color)
-            c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, "Образование")
-            right_y += style.line_spacing
-
-            # Draw each education entry
-            c.setFont(style.normal_font[0], style.normal_font[1])
-            c.setFillColor(style.text_color)
-
-            for edu in resume.educations:
-                # Draw institution, specialty and graduation year
-                education_line = f"{edu.institution} - {edu.specialty} ({edu.graduationYear})"
-                c.drawString(right_column_x + border_padding, height - right_y - style.line_spacing, education_line)
-                right_y += style.line_spacing
-
-                # Draw faculty if available
-                if edu.faculty:
-                    c.drawString(right_column_x + border_padding + 10, height - right_y - style.line_spacing,
-                               f"Факультет: {edu.faculty}")
-                    right_y += style.line_spacing
-
-                # Draw study form if available
-                if edu.studyForm:
-                    c.drawString(right_column_x + border_padding + 10, height - right_y - style.line_spacing,
-                               f"Форма обучения: {edu.studyForm}")
-                    right_y += style.line_spacing
-
-                right_y += style.line_spacing * 0.5
+        left_width = content_width * 0.35
+        right_x = style.margin_left + left_width + 20
+        left = ColumnPlan(
+            style.margin_left + padding, style.margin_left + padding + 10,
+            style.margin_left, left_width, 350 if deco.draw_section_borders else None, left_width - 2 * padding,
+            (SectionPlan("Контакты", "fields", ("phoneNumber", "email")),
+             SectionPlan("Личная информация", "fields", PERSONAL_ROWS)),
+        )
+        right = ColumnPlan(
+            right_x + padding, right_x + padding + 10,
+            right_x, content_width * 0.55, 450 if deco.draw_section_borders else None, content_width * 0.55 - 2 * padding,
+            (SectionPlan("Основная информация", "fields", ("position", "birthDate", "employment", "desiredSalary",
+                                                            "workSchedule", "isReadyForTripsKnown")),
+             SectionPlan("Опыт работы", "work_experiences"),
+             SectionPlan("Образование", "educations")),
+        )
+        columns = (left, right)
+        body_offset = 0
     else:
-        # Draw main information section
-        # y = style.margin_top
-        y += style.line_spacing 
-
-        # Draw section border if configured
-        if style.decoration_config.draw_section_borders:
-            section_start_y = y
-
-        # Main Information Section
-        c.setFont(style.section_font[0], style.section_font[1])
-        c.setFillColor(style.title_color)
-        c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, "Основная информация")
-        y += style.line_spacing
-
-        c.setFont(style.normal_font[0], style.normal_font[1])
-        c.setFillColor(style.text_color)
-
-        if resume.middleName:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Отчество: {resume.middleName}")
-            y += style.line_spacing
-
-        if resume.birthDate:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Дата рождения: {resume.birthDate.strftime('%d.%m.%Y')}")
-            y += style.line_spacing
-
-        if resume.phoneNumber:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Телефон: {resume.phoneNumber}")
-            y += style.line_spacing
-
-        if resume.email:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Email: {resume.email}")
-            y += style.line_spacing
-
-        c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Должность: {resume.position}")
-        y += style.line_spacing
-
-        if resume.employment:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Занятость: {resume.employment}")
-            y += style.line_spacing
-
-        if resume.desiredSalary:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Зарплата: {resume.desiredSalary} руб.")
-            y += style.line_spacing
-
-        if resume.workSchedule:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"График: {resume.workSchedule}")
-            y += style.line_spacing
-
-        c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Командировки: {'Да' if resume.isReadyForTrips else 'Нет'}")
-        y += style.line_spacing
-
-        if style.decoration_config.draw_section_borders:
-            section_height = y - section_start_y + border_padding
-            if section_height > 0:
-                c.setStrokeColor(style.decoration_config.border_color)
-                c.rect(style.margin_left, height - section_start_y, width - style.margin_left - style.margin_right, -section_height)
-                c.setStrokeColor(style.text_color)
-
-        y += style.line_spacing
-
-        # Personal Information Section
-        if style.decoration_config.draw_section_borders:
-            section_start_y = y
-
-        c.setFont(style.section_font[0], style.section_font[1])
-        c.setFillColor(style.title_color)
-        c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, "Личная информация")
-        y += style.line_spacing
-
-        c.setFont(style.normal_font[0], style.normal_font[1])
-        c.setFillColor(style.text_color)
-
-        c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Город: {resume.city}")
-        y += style.line_spacing
-
-        c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Готов к переезду: {'Да' if resume.canRelocate else 'Нет'}")
-        y += style.line_spacing
-
-        if resume.citizenship:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Гражданство: {resume.citizenship}")
-            y += style.line_spacing
-
-        if resume.gender:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Пол: {resume.gender}")
-            y += style.line_spacing
-
-        c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Дети: {'Есть' if resume.hasChildren else 'Нет'}")
-        y += style.line_spacing
-
-        if resume.languages:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Языки: {resume.languages}")
-            y += style.line_spacing
-
-        if resume.driverLicenses:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Вод. права: {resume.driverLicenses}")
-            y += style.line_spacing
-
-        c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Мед. книжка: {'Есть' if resume.hasMedicalBook else 'Нет'}")
-        y += style.line_spacing
-
-        if resume.personalQualities:
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, f"Качества: {resume.personalQualities}")
-            y += style.line_spacing
-
-        if style.decoration_config.draw_section_borders:
-            section_height = y - section_start_y + border_padding
-            if section_height > 0:
-                c.setStrokeColor(style.decoration_config.border_color)
-                c.rect(style.margin_left, height - section_start_y, width - style.margin_left - style.margin_right, -section_height)
-                c.setStrokeColor(style.text_color)
-
-        y += style.line_spacing
-
-        if y > height - 100:
+        bordered = deco.draw_section_borders
+        content_width = width - style.margin_left - style.margin_right
+        columns = (ColumnPlan(
+            style.margin_left + padding, style.margin_left + padding + 10,
+            style.margin_left, content_width, None, content_width - 2 * padding,
+            (SectionPlan("Основная информация", "fields", ("middleName", "birthDate", "phoneNumber", "email", "position",
+                                                            "employment", "desiredSalary", "workSchedule",
+                                                            "isReadyForTrips"), bordered),
+             SectionPlan("Личная информация", "fields", PERSONAL_ROWS, bordered),
+             SectionPlan("Опыт работы", "work_experiences", bordered=bordered),
+             SectionPlan("Образование", "educations", bordered=bordered)),
+        ),)
+        body_offset = style.line_spacing
+
+    return LayoutPlan(
+        style=style,
+        title_font=(resolve_font(style.title_font[0]), style.title_font[1]),
+        section_font=(resolve_font(style.section_font[0]), style.section_font[1]),
+        normal_font=(resolve_font(style.normal_font[0]), style.normal_font[1]),
+        width=width,
+        height=height,
+        line_spacing=style.line_spacing,
+        margin_top=style.margin_top,
+        margin_left=style.margin_left,
+        accent=deco.draw_background_accent,
+        photo=photo,
+        header_line=(style.margin_left, width - style.margin_right) if deco.draw_header_line else None,
+        body_top=100 + style.line_spacing,
+        body_offset=body_offset,
+        page_bottom=height - style.margin_bottom,
+        columns=columns,
+    )
+
+# Compiled on first use, so a theme's fonts are only loaded once something renders with it
+PLANS = {}
+
+def get_plan(style_name: str) -> LayoutPlan:
+    name = (style_name or "modern").lower()
+    if name not in STYLES:
+        name = "modern"
+    plan = PLANS.get(name)
+    if plan is None:
+        plan = PLANS[name] = compile_plan(STYLES[name])
+    return plan
+
+def _section_entries(section: SectionPlan, resume):
+    """Lines of a section as entries of (indented, text, advance) plus the gap after each entry."""
+    if section.kind == "fields":
+        lines = [(False, text, 1) for text in (FIELD_ROWS[row](resume) for row in section.rows) if text]
+        return [(lines, 0)]
+    entries = []
+    if section.kind == "work_experiences":
+        for exp in resume.work_experiences or ():
+            period = f"с {exp.startDate.strftime('%m.%Y')} по {exp.endDate.strftime('%m.%Y') if exp.endDate else 'настоящее время'}"
+            lines = [(False, f"{exp.organization} - {exp.position} ({period})", 1)]
+            if exp.responsibilities:
+                lines.append((True, exp.responsibilities, 1.5))
+            entries.append((lines, 0.5))
+    else:
+        for edu in resume.educations or ():
+            lines = [(False, f"{edu.institution} - {edu.specialty} ({edu.graduationYear})", 1)]
+            if edu.faculty:
+                lines.append((True, f"Факультет: {edu.faculty}", 1))
+            if edu.studyForm:
+                lines.append((True, f"Форма обучения: {edu.studyForm}", 1))
+            entries.append((lines, 0.5))
+    return entries
+
+class _PageLayout:
+    """Builds the positioned elements (see layout.py) of one resume.
+
+    Offsets are tracked from the top of the page, as the themes define them,
+    and converted to bottom-left PDF coordinates as elements are added.
+    """
+
+    def __init__(self, plan: LayoutPlan):
+        self.plan = plan
+        self.style = plan.style
+        self.layout = ResumeLayout(plan.width, plan.height)
+        self.add = self.layout.add
+
+    def text(self, page, x, y, font, color, text):
+        self.add(page, Text(x, self.plan.height - y - self.plan.line_spacing, font, color, text))
+
+    def close_border(self, page, column: ColumnPlan, start_y, y):
+        section_height = y - start_y + (column.text_x - column.box_x)
+        if section_height > 0:
+            self.add(page, Rect(column.box_x, self.plan.height - start_y, column.box_width, -section_height,
+                                self.style.decoration_config.border_color, None))
+
+    def wrap_entries(self, column: ColumnPlan, section: SectionPlan, resume):
+        font_name, font_size = self.plan.normal_font
+        measurer = get_measurer(font_name, font_size)
+        wrapped = []
+        for lines, gap in _section_entries(section, resume):
+            out = []
+            for indented, text, advance in lines:
+                x = column.indent_x if indented else column.text_x
+                parts = measurer.wrap(text, column.text_width - (x - column.text_x))
+                out.extend((x, part, 1 if k < len(parts) - 1 else advance) for k, part in enumerate(parts))
+            wrapped.append((out, gap))
+        return wrapped
+
+    def section(self, column: ColumnPlan, section: SectionPlan, resume, page, y):
+        plan, style = self.plan, self.style
+        ls = plan.line_spacing
+        entries = self.wrap_entries(column, section, resume)
+        if section.kind != "fields" and not entries:
+            return None
+
+        # Keep the title with the first line of the section
+        if y + 2 * ls > plan.page_bottom and y > plan.margin_top:
+            page, y = page + 1, plan.margin_top
+        start_y = y
+        self.text(page, column.text_x, y, plan.section_font, style.title_color, section.title)
+        y += ls
+
+        full_page = plan.page_bottom - plan.margin_top
+        for lines, gap in entries:
+            entry_height = sum(advance for _, _, advance in lines) * ls
+            # Move an entry that would straddle a page break, unless it can't fit on any page
+            if y + entry_height > plan.page_bottom and y > start_y + ls and entry_height <= full_page:
+                if section.bordered:
+                    self.close_border(page, column, start_y, y)
+                page, y = page + 1, plan.margin_top
+                start_y = y
+            for x, text, advance in lines:
+                if y + ls > plan.page_bottom:
+                    if section.bordered:
+                        self.close_border(page, column, start_y, y)
+                    page, y = page + 1, plan.margin_top
+                    start_y = y
+                self.text(page, x, y, plan.normal_font, style.text_color, text)
+                y += ls * advance
+            y += ls * gap
+
+        if section.bordered:
+            self.close_border(page, column, start_y, y)
+        return page, y
+
+    def photo(self, resume, photo_base_path):
+        photo = self.plan.photo
+        photo_path = resolve_photo_path(resume.photo.filename, photo_base_path)
+        derived_path = derived_photo_path(photo_path, photo.width, photo.height)
+        if os.path.exists(derived_path):
+            photo_path = derived_path
+        if not os.path.exists(photo_path):
+            return False
+        self.add(0, Photo(photo_path, photo.x, photo.y, photo.width, photo.height, photo.is_circular,
+                          self.style.decoration_config.line_color))
+        return True
+
+    def build(self, resume, photo_base_path):
+        plan, style = self.plan, self.style
+        deco = style.decoration_config
+
+        if plan.accent:
+            self.add(0, Rect(0, plan.height - 100, plan.width, 100, black, deco.accent_color))
+
+        y = plan.margin_top
+        if getattr(resume, "photo", None) and plan.photo and self.photo(resume, photo_base_path):
+            y = plan.photo.next_y
+
+        header = f"{resume.firstName} {resume.middleName or ''} {resume.lastName}"
+        self.add(0, Text(plan.margin_left, plan.height - y, plan.title_font, style.title_color, header))
+        y += plan.line_spacing * 2
+
+        if plan.header_line:
+            self.add(0, Line(plan.header_line[0], plan.height - y, plan.header_line[1], plan.height - y,
+                             deco.line_color, deco.line_thickness))
+
+        y = max(y, plan.body_top) + plan.body_offset
+
+        for column in plan.columns:
+            page, column_y = 0, y
+            if column.box_height:
+                self.add(0, Rect(column.box_x, plan.height - column_y - column.box_height,
+                                 column.box_width, column.box_height, deco.border_color, None))
+            for section in column.sections:
+                placed = self.section(column, section, resume, page, column_y)
+                if placed is not None:
+                    page, column_y = placed
+                    column_y += plan.line_spacing
+        return self.layout
+
+def layout_resume(resume, plan: LayoutPlan, photo_base_path="photos") -> ResumeLayout:
+    return _PageLayout(plan).build(resume, photo_base_path)
+
+def _draw_photo(c, photo: Photo, optimize=False):
+    masked = photo.is_circular and not optimize
+    img = load_photo(photo.path, circular=masked)
+    c.saveState()
+    c.setFillColor(colors.white)
+    c.setStrokeColor(photo.border_color)
+    c.setLineWidth(1)
+    if photo.is_circular:
+        cx, cy, r = photo.x + photo.width / 2, photo.y + photo.height / 2, min(photo.width, photo.height) / 2
+        c.circle(cx, cy, r, stroke=1, fill=1)
+        p = c.beginPath()
+        p.circle(cx, cy, r)
+        c.clipPath(p, stroke=0)
+    else:
+        c.rect(photo.x, photo.y, photo.width, photo.height, stroke=1, fill=1)
+    c.drawImage(img, photo.x, photo.y, photo.width, photo.height, mask='auto' if masked else None)
+    c.restoreState()
+
+def draw_pages(c, layout: ResumeLayout, optimize=False):
+    """PDF backend: draw a computed layout on a reportlab canvas."""
+    for index, elements in enumerate(layout.pages):
+        if index:
             c.showPage()
-            y = style.margin_top
-            c.setFont(style.normal_font[0], style.normal_font[1])
-            c.setFillColor(style.text_color)
-
-        if resume.work_experiences:
-            section_start_y = y
-
-            c.setFont(style.section_font[0], style.section_font[1])
-            c.setFillColor(style.title_color)
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, "Опыт работы")
-            y += style.line_spacing
-
-            c.setFont(style.normal_font[0], style.normal_font[1])
-            c.setFillColor(style.text_color)
-
-            for exp in resume.work_experiences:
-                period = f"с {exp.startDate.strftime('%m.%Y')} по {exp.endDate.strftime('%m.%Y') if exp.endDate else 'настоящее время'}"
-                c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, 
-                            f"{exp.organization} - {exp.position} ({period})")
-                y += style.line_spacing
-
-                if exp.responsibilities:
-                    c.drawString(style.margin_left + border_padding + 10, height - y - style.line_spacing,
-                               exp.responsibilities)
-                    y += style.line_spacing * 1.5
-
-                y += style.line_spacing * 0.5
-
-                if y > height - 100:
-                    if style.decoration_config.draw_section_borders:
-                        section_height = y - section_start_y + border_padding
-                        if section_height > 0:
-                            c.setStrokeColor(style.decoration_config.border_color)
-                            c.rect(style.margin_left, height - section_start_y, 
-                                  width - style.margin_left - style.margin_right, -section_height)
-                            c.setStrokeColor(style.text_color)
-
-                    c.showPage()
-                    y = style.margin_top
-                    c.setFont(style.normal_font[0], style.normal_font[1])
-                    c.setFillColor(style.text_color)
-                    section_start_y = y
-
-            if style.decoration_config.draw_section_borders:
-                section_height = y - section_start_y + border_padding
-                if section_height > 0:
-                    c.setStrokeColor(style.decoration_config.border_color)
-                    c.rect(style.margin_left, height - section_start_y,
-                          width - style.margin_left - style.margin_right, -section_height)
-                    c.setStrokeColor(style.text_color)
-
-            y += style.line_spacing
-
-        if resume.educations:
-            section_start_y = y
-
-            c.setFont(style.section_font[0], style.section_font[1])
-            c.setFillColor(style.title_color)
-            c.drawString(style.margin_left + border_padding, height - y - style.line_spacing, "Образование")
-            y += style.line_spacing
-
-            c.setFont(style.normal_font[0], style.normal_font[1])
-            c.setFillColor(style.text_color)
-
-            for idx, edu in enumerate(resume.educations):
-                c.drawString(style.margin_left + border_padding, height - y - style.line_spacing,
-                            f"{edu.institution} - {edu.specialty} ({edu.graduationYear})")
-                y += style.line_spacing
-
-                if edu.faculty:
-                    c.drawString(style.margin_left + border_padding + 10, height - y - style.line_spacing,
-                               f"Факультет: {edu.faculty}")
-                    y += style.line_spacing
-
-                if edu.studyForm:
-                    c.drawString(style.margin_left + border_padding + 10, height - y - style.line_spacing,
-                               f"Форма обучения: {edu.studyForm}")
-                    y += style.line_spacing
-
-                y += style.line_spacing * 0.5
-
-                if idx == len(resume.educations) - 1:
-                    continue
-                
-                if y > height - 100:
-                    if style.decoration_config.draw_section_borders:
-                        section_height = y - section_start_y + border_padding
-                        if section_height > 0:
-                            c.setStrokeColor(style.decoration_config.border_color)
-                            c.rect(style.margin_left, height - section_start_y,
-                                  width - style.margin_left - style.margin_right, -section_height)
-                            c.setStrokeColor(style.text_color)
-
-                    c.showPage()
-                    y = style.margin_top
-                    c.setFont(style.normal_font[0], style.normal_font[1])
-                    c.setFillColor(style.text_color)
-                    section_start_y = y
-
-            if style.decoration_config.draw_section_borders:
-                section_height = y - section_start_y + border_padding
-                if section_height > 0:
-                    c.setStrokeColor(style.decoration_config.border_color)
-                    c.rect(style.margin_left, height - section_start_y,
-                          width - style.margin_left - style.margin_right, -section_height)
-                    c.setStrokeColor(style.text_color)
-
-            y += style.line_spacing
-
-    ######
-
+        font = fill = None
+        for el in elements:
+            kind = type(el)
+            if kind is Text:
+                if el.font != font:
+                    c.setFont(*el.font)
+                    font = el.font
+                if el.color != fill:
+                    c.setFillColor(el.color)
+                    fill = el.color
+                c.drawString(el.x, el.y, el.text)
+            elif kind is Rect:
+                if el.fill is not None:
+                    c.setFillColor(el.fill)
+                    fill = el.fill
+                if el.stroke is not None:
+                    c.setStrokeColor(el.stroke)
+                c.rect(el.x, el.y, el.width, el.height, stroke=1 if el.stroke is not None else 0,
+                       fill=1 if el.fill is not None else 0)
+            elif kind is Line:
+                c.setStrokeColor(el.color)
+                c.setLineWidth(el.thickness)
+                c.line(el.x1, el.y1, el.x2, el.y2)
+            elif kind is Photo:
+                try:
+                    _draw_photo(c, el, optimize)
+                except Exception as ex:
+                    print(f"Ошибка загрузки фото: {ex}")
+
+def render_resume_pdf(resume: Resume, style_name="modern", photo_base_path="photos", optimize=PDF_OPTIMIZE):
+    """Render a resume to PDF bytes.
+
+    TrueType fonts are always embedded as subsets of the glyphs used, and
+    reportlab writes an image drawn more than once as a single XObject;
+    ``optimize`` adds the reductions described at PDF_OPTIMIZE.
+    """
+    plan = get_plan(style_name)
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    draw_pages(c, layout_resume(resume, plan, photo_base_path), optimize)
     c.save()
     buffer.seek(0)
-    return buffer.getvalue()
\ No newline at end of file
+    return buffer.getvalue()
@@ -0,0 +1,201 @@
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import date, datetime
+from typing import Optional
+
+from reportlab.lib.colors import Color
+
+from lru import LRUCache
+from pdf import get_style, resolve_photo_path, PDF_OPTIMIZE, RENDER_VERSION
+
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR") or None
+PDF_CACHE_DISK_MAX_BYTES = int(os.getenv("PDF_CACHE_DISK_MAX_BYTES", 1024 * 1024 * 1024))
+
+_photo_digests = LRUCache(4096, sizeof=lambda _: 1)
+_style_fingerprints = {}
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Color):
+        return value.hexvala()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if hasattr(value, "__dict__"):
+        return {k: _plain(v) for k, v in sorted(vars(value).items())}
+    return value
+
+
+def style_fingerprint(style_name: str) -> str:
+    style = get_style(style_name)
+    fingerprint = _style_fingerprints.get(style.name)
+    if fingerprint is None:
+        fingerprint = json.dumps(
+            {"style": _plain(style), "optimize": PDF_OPTIMIZE, "version": RENDER_VERSION}, sort_keys=True)
+        _style_fingerprints[style.name] = fingerprint
+    return fingerprint
+
+
+def photo_digest(path: str) -> Optional[str]:
+    """sha256 of the photo file, memoized on (path, mtime, size)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    memo_key = (path, st.st_mtime_ns, st.st_size)
+    digest = _photo_digests.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _photo_digests.put(memo_key, digest)
+    return digest
+
+
+def resume_cache_key(snapshot, style_name: str, photo_base_path="photos") -> str:
+    """Content hash of everything that affects the rendered PDF.
+
+    ``snapshot`` is the output of ``pdf.snapshot_resume``. Stats the photo and
+    hashes it the first time, so async code calls this in a thread.
+    """
+    content = _plain(snapshot)
+    if snapshot.photo:
+        content["photo"] = photo_digest(resolve_photo_path(snapshot.photo.filename, photo_base_path))
+    payload = json.dumps({"resume": content, "style": style_fingerprint(style_name)}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """Rendered PDFs keyed by ``resume_cache_key``.
+
+    Keys are content hashes, so a stale entry can never be served; invalidation
+    only exists to release memory and disk held by outdated renders. The disk
+    tier is kept under ``disk_max_bytes`` by removing the least recently used
+    files, and is read and written in a thread so the event loop never waits
+    on the filesystem.
+    """
+
+    def __init__(self, max_bytes: int = PDF_CACHE_MAX_BYTES, disk_dir: Optional[str] = PDF_CACHE_DIR,
+                 disk_max_bytes: int = PDF_CACHE_DISK_MAX_BYTES):
+        self.memory = LRUCache(max_bytes, on_evict=self._forget)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._keys_by_resume = {}
+        self._disk_size: Optional[int] = None
+        self._disk_lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, resume_id: str, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{resume_id}-{key}.pdf")
+
+    async def get(self, resume_id: str, key: str) -> Optional[bytes]:
+        data = self.memory.get((resume_id, key))
+        if data is not None or not self.disk_dir:
+            return data
+        data = await asyncio.to_thread(self._read_disk, resume_id, key)
+        if data is not None:
+            self._remember(resume_id, key, data)
+        return data
+
+    async def put(self, resume_id: str, key: str, data: bytes):
+        self._remember(resume_id, key, data)
+        if self.disk_dir:
+            await asyncio.to_thread(self.write_disk, resume_id, key, data)
+
+    async def invalidate(self, resume_id: str):
+        for key in self._keys_by_resume.pop(resume_id, ()):
+            self.memory.pop((resume_id, key))
+        if self.disk_dir:
+            await asyncio.to_thread(self._remove_disk, resume_id)
+
+    def _remember(self, resume_id: str, key: str, data: bytes):
+        self.memory.put((resume_id, key), data)
+        self._keys_by_resume.setdefault(resume_id, set()).add(key)
+
+    def _forget(self, memory_key, _data):
+        resume_id, key = memory_key
+        keys = self._keys_by_resume.get(resume_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_resume[resume_id]
+
+    def _read_disk(self, resume_id: str, key: str) -> Optional[bytes]:
+        path = self._disk_path(resume_id, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # The mtime is the file's last use, which _prune_disk goes by
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def write_disk(self, resume_id: str, key: str, data: bytes):
+        """Store a render in the disk tier only, for processes that don't serve it themselves."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._disk_path(resume_id, key))
+        with self._disk_lock:
+            if self._disk_size is not None:
+                self._disk_size += len(data)
+            if self._disk_size is None or self._disk_size > self.disk_max_bytes:
+                self._prune_disk()
+
+    def _prune_disk(self):
+        """Recount the disk tier, which other processes write too, and trim it to 90% of the limit.
+
+        The margin keeps every write near the limit from rescanning the directory.
+        """
+        files = []
+        for path in glob.glob(os.path.join(glob.escape(self.disk_dir), "*.pdf")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        size = sum(file_size for _, file_size, _ in files)
+        if size > self.disk_max_bytes:
+            for _, file_size, path in sorted(files):
+                if size <= self.disk_max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                size -= file_size
+        self._disk_size = size
+
+    def _remove_disk(self, resume_id: str):
+        for path in glob.glob(os.path.join(glob.escape(self.disk_dir), f"{glob.escape(resume_id)}-*.pdf")):
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            with self._disk_lock:
+                if self._disk_size is not None:
+                    self._disk_size -= size
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+pdf_cache = PdfCache()
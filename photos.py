@@ -0,0 +1,86 @@
+import glob
+import os
+import tempfile
+
+from fastapi import UploadFile
+from PIL import Image, ImageOps
+
+from pdf import STYLES, PHOTO_PIXELS_PER_POINT, derived_photo_path
+
+PHOTO_DIR = "photos"
+MAX_PHOTO_BYTES = int(os.getenv("MAX_PHOTO_BYTES", 10 * 1024 * 1024))
+PHOTO_CHUNK_SIZE = 64 * 1024
+# Refuse decompression bombs well before Pillow's own (warning-only) limit.
+MAX_PHOTO_PIXELS = 50_000_000
+
+
+class PhotoTooLarge(Exception):
+    pass
+
+
+class InvalidPhoto(Exception):
+    pass
+
+
+async def save_upload(upload: UploadFile, dest_path: str, max_bytes: int = MAX_PHOTO_BYTES):
+    """Stream an upload to ``dest_path`` in chunks, never holding it in memory.
+
+    The data goes to a temp file in the same directory and is renamed into
+    place only once complete, so readers never see a partial photo.
+    """
+    directory = os.path.dirname(dest_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        written = 0
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await upload.read(PHOTO_CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise PhotoTooLarge()
+                f.write(chunk)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def photo_sizes():
+    """Distinct (width, height) point boxes the themes draw photos in."""
+    return sorted({(s.photo_config.width, s.photo_config.height) for s in STYLES.values() if s.photo_config})
+
+
+def derive_photo_variants(photo_path: str):
+    """Write a normalized JPEG of the photo for every theme's photo box.
+
+    Blocking; run it in a worker thread.
+    """
+    try:
+        with Image.open(photo_path) as img:
+            if img.width * img.height > MAX_PHOTO_PIXELS:
+                raise InvalidPhoto("Image is too large")
+            largest = max(max(w, h) for w, h in photo_sizes()) * PHOTO_PIXELS_PER_POINT
+            # Lets the JPEG decoder downscale while decoding instead of
+            # materializing the full-resolution image.
+            img.draft("RGB", (largest, largest))
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            os.makedirs(os.path.join(os.path.dirname(photo_path), "derived"), exist_ok=True)
+            for width, height in photo_sizes():
+                size = (int(width * PHOTO_PIXELS_PER_POINT), int(height * PHOTO_PIXELS_PER_POINT))
+                variant = ImageOps.fit(img, size, Image.LANCZOS)
+                target = derived_photo_path(photo_path, width, height)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".part")
+                with os.fdopen(fd, "wb") as f:
+                    variant.save(f, "JPEG", quality=85, optimize=True)
+                os.replace(tmp_path, target)
+    except (OSError, Image.DecompressionBombError) as ex:
+        raise InvalidPhoto(str(ex))
+
+
+def remove_photo_files(photo_path: str):
+    directory, filename = os.path.split(photo_path)
+    stem = os.path.splitext(filename)[0]
+    pattern = os.path.join(glob.escape(os.path.join(directory, "derived")), f"{glob.escape(stem)}.*x*.jpg")
+    for path in [photo_path] + glob.glob(pattern):
+        if os.path.exists(path):
+            os.remove(path)
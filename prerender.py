@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import os
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from database import AsyncSessionLocal, Resume
+from pdf import snapshot_resume
+from render_pool import render_cached, RenderQueueFull
+
+PDF_PRERENDER = os.getenv("PDF_PRERENDER", "0") == "1"
+# Quiet period after the last write before the resume is rendered
+PDF_PRERENDER_DELAY = float(os.getenv("PDF_PRERENDER_DELAY", 2))
+
+logger = logging.getLogger(__name__)
+
+
+class Prerenderer:
+    """Re-renders a resume's PDF into pdf_cache shortly after it changes.
+
+    Each write restarts the resume's timer, so a burst of edits produces one
+    render of the final state. Rendering is best effort: a busy pool or a
+    failed render only means the next GET renders on demand.
+    """
+
+    def __init__(self, enabled: bool = PDF_PRERENDER, delay: float = PDF_PRERENDER_DELAY):
+        self.enabled = enabled
+        self.delay = delay
+        self._timers = {}
+        self._tasks = set()
+
+    def schedule(self, resume_id: str):
+        """Call after the write is committed."""
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        timer = self._timers.pop(resume_id, None)
+        if timer is not None:
+            timer.cancel()
+        self._timers[resume_id] = loop.call_later(self.delay, self._start, resume_id)
+
+    def _start(self, resume_id: str):
+        self._timers.pop(resume_id, None)
+        task = asyncio.ensure_future(self._render(resume_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _render(self, resume_id: str):
+        try:
+            async with AsyncSessionLocal() as db:
+                db_resume = await db.scalar(
+                    select(Resume)
+                    .options(selectinload(Resume.work_experiences), selectinload(Resume.educations), selectinload(Resume.photo))
+                    .where(Resume.id == resume_id)
+                )
+            if db_resume is None:
+                return
+            await render_cached(resume_id, snapshot_resume(db_resume), db_resume.theme or "modern")
+        except RenderQueueFull:
+            logger.info("Render pool busy; not prerendering resume %s", resume_id)
+        except Exception:
+            logger.exception("Prerendering resume %s failed", resume_id)
+
+    def shutdown(self):
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for task in self._tasks:
+            task.cancel()
+
+
+prerenderer = Prerenderer()
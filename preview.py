@@ -0,0 +1,43 @@
+import os
+from typing import Optional
+
+from pdf_cache import PdfCache, resume_cache_key
+from raster import render_resume_image
+from render_pool import render_pool
+
+PREVIEW_CACHE_MAX_BYTES = int(os.getenv("PREVIEW_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+PREVIEW_MIN_WIDTH = 64
+PREVIEW_MAX_WIDTH = 1200
+# Requested widths are rounded up to one of these, so arbitrary widths can't
+# each fill the cache with their own render
+PREVIEW_WIDTHS = (160, 320, 640, PREVIEW_MAX_WIDTH)
+# format query value -> (Pillow format, media type)
+PREVIEW_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+# Same per-resume bookkeeping as the PDF cache, memory only: previews are
+# small and cheap to redraw.
+preview_cache = PdfCache(PREVIEW_CACHE_MAX_BYTES, disk_dir=None)
+
+
+def preview_width(width: int) -> int:
+    """The smallest of PREVIEW_WIDTHS that is at least ``width``."""
+    return next((bucket for bucket in PREVIEW_WIDTHS if bucket >= width), PREVIEW_WIDTHS[-1])
+
+
+def preview_cache_key(snapshot, style_name: str, width: int, fmt: str, cache_key: Optional[str] = None) -> str:
+    if cache_key is None:
+        cache_key = resume_cache_key(snapshot, style_name)
+    return f"{cache_key}-{width}.{fmt}"
+
+
+async def preview_cached(resume_id: str, snapshot, style_name: str, width: int, fmt: str, key: str) -> bytes:
+    """First page of a resume at ``width`` pixels, drawn in the render pool on a cache miss."""
+    data = await preview_cache.get(resume_id, key)
+    if data is None:
+        image_format = PREVIEW_FORMATS[fmt][0]
+        data = await render_pool.run(render_resume_image, snapshot, style_name, "photos", width, 0, image_format)
+        await preview_cache.put(resume_id, key, data)
+    return data
@@ -0,0 +1,113 @@
+"""Raster backend: draws a computed resume layout with Pillow.
+
+Meant for preview thumbnails, so it favours speed over fidelity: text is
+drawn from cached glyph masks without kerning, and shapes are not
+anti-aliased.
+"""
+from functools import lru_cache
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from fonts import font_file
+from layout import ResumeLayout, Text, Rect, Line, Photo, rgb, normalized_rect
+from pdf import get_plan, layout_resume
+
+PREVIEW_WIDTH = 400
+
+
+class _Glyphs:
+    """Glyph masks of one font at one pixel size, rasterized once and pasted per character.
+
+    FreeType rendering a whole line per call dominates thumbnail time, and
+    resumes reuse a small alphabet. Kerning is lost, which at thumbnail
+    sizes isn't visible.
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self._glyphs = {}
+
+    def glyph(self, char: str):
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            left, top, right, bottom = self.font.getbbox(char, anchor="ls")
+            mask = None
+            if right > left and bottom > top:
+                mask = Image.new("L", (right - left, bottom - top), 0)
+                ImageDraw.Draw(mask).text((-left, -top), char, fill=255, font=self.font, anchor="ls")
+            glyph = self._glyphs[char] = (mask, left, top, self.font.getlength(char))
+        return glyph
+
+    def draw(self, img: Image.Image, x: float, y: int, text: str, color):
+        for char in text:
+            mask, left, top, advance = self.glyph(char)
+            if mask is not None:
+                img.paste(color, (round(x) + left, y + top), mask)
+            x += advance
+
+
+@lru_cache(maxsize=64)
+def _glyphs(font_name: str, pixel_size: int) -> _Glyphs:
+    path = font_file(font_name)
+    if path:
+        return _Glyphs(ImageFont.truetype(path, pixel_size, layout_engine=ImageFont.Layout.BASIC))
+    return _Glyphs(ImageFont.load_default(pixel_size))
+
+
+def _paste_photo(img: Image.Image, draw: ImageDraw.ImageDraw, photo: Photo, box):
+    size = (max(1, box[2] - box[0]), max(1, box[3] - box[1]))
+    with Image.open(photo.path) as source:
+        source.draft("RGB", size)
+        picture = ImageOps.fit(source.convert("RGB"), size, Image.BILINEAR)
+    if photo.is_circular:
+        mask = Image.new("L", size, 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, size[0] - 1, size[1] - 1), fill=255)
+        img.paste(picture, box[:2], mask)
+        draw.ellipse(box, outline=rgb(photo.border_color))
+    else:
+        img.paste(picture, box[:2])
+        draw.rectangle(box, outline=rgb(photo.border_color))
+
+
+def draw_page(layout: ResumeLayout, page: int, width: int = PREVIEW_WIDTH) -> Image.Image:
+    scale = width / layout.width
+    height = round(layout.height * scale)
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+
+    def point(x, y):
+        return round(x * scale), round((layout.height - y) * scale)
+
+    for el in layout.pages[page]:
+        kind = type(el)
+        if kind is Text:
+            glyphs = _glyphs(el.font[0], max(1, round(el.font[1] * scale)))
+            glyphs.draw(img, el.x * scale, round((layout.height - el.y) * scale), el.text, rgb(el.color))
+        elif kind is Rect:
+            left, bottom, right, top = normalized_rect(el)
+            draw.rectangle(point(left, top) + point(right, bottom),
+                           fill=rgb(el.fill) if el.fill is not None else None,
+                           outline=rgb(el.stroke) if el.stroke is not None else None,
+                           width=max(1, round(scale)))
+        elif kind is Line:
+            draw.line(point(el.x1, el.y1) + point(el.x2, el.y2), fill=rgb(el.color),
+                      width=max(1, round(el.thickness * scale)))
+        elif kind is Photo:
+            try:
+                _paste_photo(img, draw, el, point(el.x, el.y + el.height) + point(el.x + el.width, el.y))
+            except OSError as ex:
+                print(f"Ошибка загрузки фото: {ex}")
+    return img
+
+
+def render_raster(layout: ResumeLayout, width: int = PREVIEW_WIDTH, page: int = 0, image_format: str = "PNG") -> bytes:
+    buffer = BytesIO()
+    draw_page(layout, page, width).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def render_resume_image(resume, style_name="modern", photo_base_path="photos", width: int = PREVIEW_WIDTH,
+                        page: int = 0, image_format: str = "PNG") -> bytes:
+    """One page of a resume as PNG or WebP, from the same layout the PDF uses."""
+    return render_raster(layout_resume(resume, get_plan(style_name), photo_base_path), width, page, image_format)
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fonts import preload_fonts
+from pdf import render_resume_pdf
+from pdf_cache import pdf_cache, resume_cache_key
+
+PDF_POOL_SIZE = int(os.getenv("PDF_POOL_SIZE", os.cpu_count() or 2))
+PDF_QUEUE_DEPTH = int(os.getenv("PDF_QUEUE_DEPTH", 32))
+PDF_JOB_TIMEOUT = float(os.getenv("PDF_JOB_TIMEOUT", 30))
+PDF_RETRY_AFTER = int(os.getenv("PDF_RETRY_AFTER", 2))
+
+
+class RenderQueueFull(Exception):
+    """Raised when more renders are in flight than the pool accepts."""
+
+
+class RenderTimeout(Exception):
+    """Raised when a single render exceeds PDF_JOB_TIMEOUT."""
+
+
+class RenderPool:
+    """Bounded process pool that keeps reportlab off the event loop.
+
+    At most ``size + queue_depth`` jobs are admitted at once; anything beyond
+    that is rejected immediately so the caller can answer with 503 instead of
+    piling work up behind the workers. Only ``size`` of them are handed to the
+    executor at a time and the rest wait their turn here, so ``timeout`` only
+    counts the time a worker spends on the job.
+    """
+
+    def __init__(self, size: int = PDF_POOL_SIZE, queue_depth: int = PDF_QUEUE_DEPTH, timeout: float = PDF_JOB_TIMEOUT):
+        self.size = size
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._workers = asyncio.Semaphore(size)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Parsed here, forked workers inherit the fonts instead of each parsing them;
+            # the initializer covers platforms that spawn workers instead.
+            preload_fonts()
+            self._executor = ProcessPoolExecutor(max_workers=self.size, initializer=preload_fonts)
+        return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """Throw a stuck or broken pool away; the next job starts a fresh one.
+
+        ProcessPoolExecutor can't stop a single worker, so every worker of the
+        pool is killed. Jobs still running on it fail with BrokenProcessPool.
+        """
+        if self._executor is executor:
+            self._executor = None
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.size + self.queue_depth:
+                raise RenderQueueFull()
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def render(self, snapshot, style_name: str = "modern") -> bytes:
+        """Render a resume snapshot (see ``pdf.snapshot_resume``) in a worker process."""
+        return await self.run(render_resume_pdf, snapshot, style_name)
+
+    async def run(self, fn, *args):
+        """Run a picklable function in a worker process under the same admission limit and timeout."""
+        self._acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            # Holding one of ``size`` slots, the job goes straight to an idle worker
+            async with self._workers:
+                while True:
+                    executor = self._get_executor()
+                    try:
+                        return await asyncio.wait_for(loop.run_in_executor(executor, fn, *args), timeout=self.timeout)
+                    except asyncio.TimeoutError:
+                        # The worker is still busy with the job; killing it is the only way to get it back
+                        self._recycle(executor)
+                        raise RenderTimeout()
+                    except BrokenProcessPool:
+                        recycled = self._executor is not executor
+                        self._recycle(executor)
+                        # Killed along with another job's stuck worker: run again on the new pool.
+                        # A job whose own worker died is not retried, it would likely kill the next one too.
+                        if not recycled:
+                            raise
+        finally:
+            self._release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+render_pool = RenderPool()
+
+
+async def render_cached(resume_id: str, snapshot, style_name: str, cache_key: Optional[str] = None) -> bytes:
+    """Serve a resume PDF from pdf_cache, rendering it in the pool on a miss."""
+    if cache_key is None:
+        cache_key = await asyncio.to_thread(resume_cache_key, snapshot, style_name)
+    pdf_bytes = await pdf_cache.get(resume_id, cache_key)
+    if pdf_bytes is None:
+        pdf_bytes = await render_pool.render(snapshot, style_name)
+        await pdf_cache.put(resume_id, cache_key, pdf_bytes)
+    return pdf_bytes
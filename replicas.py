@@ -0,0 +1,164 @@
+"""Read-only sessions on replicas of the primary database.
+
+Read handlers take their session from ``get_read_db``, which hands out
+replicas from DB_READ_REPLICA_URLS in turn. The replica is picked when the
+session's first query needs a connection, so a request that doesn't query
+(say, one authenticated from the user cache) never touches a database.
+Checking that connection out of the pool runs its pre-ping; a replica that
+fails it is skipped for DB_REPLICA_RETRY_INTERVAL seconds and then tried
+again. With every replica down, or none configured, reads go to the
+primary. So do a client's reads for DB_READ_YOUR_WRITES_SECONDS after it
+wrote (see ``mark_recent_write``), so it doesn't read its own write back
+from a replica that is behind.
+
+Locally, copies of the SQLite file stand in for replicas:
+``DB_READ_REPLICA_URLS=sqlite:///file:replica.db?mode=ro&uri=true``.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from database import AsyncSessionLocal, READ_YOUR_WRITES_COOKIE, async_engine, create_async_db_engine
+
+DB_READ_REPLICA_URLS = [url.strip() for url in os.getenv("DB_READ_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_RETRY_INTERVAL = float(os.getenv("DB_REPLICA_RETRY_INTERVAL", 30))
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine = create_async_db_engine(url)
+        self.name = self.engine.url.render_as_string(hide_password=True)
+        self.down_until = 0.0
+        self.served = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+
+class ReplicaSession(Session):
+    """Session on the primary that moves its queries to a replica once the first one runs.
+
+    ``get_bind`` is called when a query needs a connection; the first call
+    checks one out from a healthy replica and the session keeps using it
+    until it is closed. Without a replica the session stays on the primary.
+    """
+
+    def __init__(self, *args, replicas: "ReadReplicas", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self._replica_connection: Optional[Connection] = None
+        self._routed = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if not self._routed:
+            self._routed = True
+            self._replica_connection = self.replicas.connect()
+        return self._replica_connection or super().get_bind(mapper, clause=clause, **kwargs)
+
+    def close(self):
+        super().close()
+        if self._replica_connection is not None:
+            self._replica_connection.close()
+            self._replica_connection = None
+        self._routed = False
+
+
+class ReadReplicas:
+    def __init__(self, urls: List[str], retry_interval: float = DB_REPLICA_RETRY_INTERVAL):
+        self.replicas = [Replica(url) for url in urls]
+        self.retry_interval = retry_interval
+        self.sessionmaker = async_sessionmaker(async_engine, sync_session_class=ReplicaSession,
+                                               autoflush=False, expire_on_commit=False)
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self._fallbacks = 0
+
+    def _candidates(self):
+        """Replicas not marked down, starting from the next one in turn."""
+        if not self.replicas:
+            return []
+        start = next(self._turn) % len(self.replicas)
+        now = time.monotonic()
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.down_until <= now]
+
+    def session(self) -> AsyncSession:
+        """A session whose queries go to a replica, picked when the first one runs (see ReplicaSession)."""
+        return self.sessionmaker(replicas=self)
+
+    def connect(self) -> Optional[Connection]:
+        """A connection to a healthy replica, or None if there is none.
+
+        Called from ReplicaSession.get_bind, which runs in the async session's
+        greenlet, so the async engines can be driven synchronously here.
+        """
+        for replica in self._candidates():
+            try:
+                # Checking a connection out runs the pool's pre-ping, so a dead replica fails here
+                connection = replica.engine.sync_engine.connect()
+            except (DBAPIError, OSError) as ex:
+                with self._lock:
+                    replica.down_until = time.monotonic() + self.retry_interval
+                    replica.failures += 1
+                    replica.last_error = f"{type(ex).__name__}: {ex}".splitlines()[0]
+                logger.warning("Read replica %s is down (%s); retrying in %.0fs",
+                               replica.name, replica.last_error, self.retry_interval)
+                continue
+            with self._lock:
+                replica.down_until = 0.0
+                replica.served += 1
+            return connection
+        with self._lock:
+            self._fallbacks += 1
+        return None
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "primaryFallbacks": self._fallbacks,
+                "replicas": [
+                    {
+                        "url": replica.name,
+                        "healthy": replica.down_until <= now,
+                        "served": replica.served,
+                        "failures": replica.failures,
+                        "lastError": replica.last_error,
+                    }
+                    for replica in self.replicas
+                ],
+            }
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+read_replicas = ReadReplicas(DB_READ_REPLICA_URLS)
+
+
+def reads_own_writes(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+# Dependency for read-only handlers
+async def get_read_db(request: Request):
+    if read_replicas.replicas and not reads_own_writes(request):
+        db = read_replicas.session()
+    else:
+        db = AsyncSessionLocal()
+    async with db:
+        yield db
@@ -0,0 +1,58 @@
+"""Measure cold `import main` time in fresh interpreters.
+
+    python scripts/bench_import.py --runs 10
+
+Each run starts a new Python process, so nothing is shared between runs
+except the OS page cache. Use --module to time another module and
+--importtime to print the slowest imports of one run (python -X importtime).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMER = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def time_import(module: str) -> float:
+    result = subprocess.run([sys.executable, "-c", TIMER.format(module=module)], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, top: int):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--importtime", type=int, metavar="N", default=0, help="also list the N slowest imports")
+    args = parser.parse_args()
+
+    times = [time_import(args.module) for _ in range(args.runs)]
+    print(f"import {args.module}: {args.runs} runs")
+    print(f"  min    {min(times) * 1000:8.1f} ms")
+    print(f"  median {statistics.median(times) * 1000:8.1f} ms")
+    print(f"  max    {max(times) * 1000:8.1f} ms")
+
+    if args.importtime:
+        print("slowest imports (cumulative / self, ms):")
+        for cumulative, self_time, name in slowest_imports(args.module, args.importtime):
+            print(f"  {cumulative / 1000:8.1f} {self_time / 1000:8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Report rendered PDF size per theme, with and without PDF_OPTIMIZE.
+
+    python scripts/bench_pdf_size.py [--json sizes.json]
+
+Run from the project root (the theme fonts are looked up there, see
+FONT_DIR). A synthetic photo is generated in a temporary directory.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf import STYLES, render_resume_pdf  # noqa: E402
+from sample_data import sample_resume, make_sample_photo  # noqa: E402
+
+
+def measure(photo_dir: str):
+    photo = make_sample_photo(photo_dir)
+    cases = {
+        "small": sample_resume(1, 1, photo, text_repeat=1),
+        "typical": sample_resume(3, 2, photo),
+        "large": sample_resume(15, 5, photo),
+    }
+    rows = []
+    for theme in STYLES:
+        for case, resume in cases.items():
+            plain = len(render_resume_pdf(resume, theme, photo_dir, optimize=False))
+            optimized = len(render_resume_pdf(resume, theme, photo_dir, optimize=True))
+            rows.append({"theme": theme, "case": case, "bytes": plain, "optimizedBytes": optimized})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as photo_dir:
+        rows = measure(photo_dir)
+
+    print(f"{'theme':<14}{'case':<10}{'bytes':>10}{'optimized':>12}{'saved':>8}")
+    for row in rows:
+        saved = 1 - row["optimizedBytes"] / row["bytes"]
+        print(f"{row['theme']:<14}{row['case']:<10}{row['bytes']:>10}{row['optimizedBytes']:>12}{saved:>8.0%}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
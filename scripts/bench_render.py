@@ -0,0 +1,178 @@
+"""Rendering benchmark across themes, resume sizes and photo/no photo.
+
+    python scripts/bench_render.py --json results.json
+    python scripts/bench_render.py --sizes 0,200 --themes modern --backend png
+    python scripts/bench_render.py --compare results.json
+
+Every case renders a synthetic resume with N work experiences and N
+educations and reports latency percentiles, output bytes, page count and
+peak RSS. ``ru_maxrss`` only ever grows, so in a single process it is the
+peak so far; pass --isolate to run each case in its own interpreter and get
+a per-case peak. --compare exits with status 1 when a case's median got
+slower than --threshold times the baseline.
+
+Run from the project root so the theme fonts are found (see FONT_DIR).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf import STYLES, get_plan, layout_resume, render_resume_pdf  # noqa: E402
+from sample_data import sample_resume, make_sample_photo  # noqa: E402
+
+DEFAULT_SIZES = (0, 1, 10, 50, 200)
+
+
+def _render_pdf(resume, theme, photo_dir):
+    return render_resume_pdf(resume, theme, photo_dir)
+
+
+def _render_png(resume, theme, photo_dir):
+    from raster import render_raster
+    return render_raster(layout_resume(resume, get_plan(theme), photo_dir))
+
+
+def _render_html(resume, theme, photo_dir):
+    from html_layout import render_html
+    return render_html(layout_resume(resume, get_plan(theme), photo_dir)).encode("utf-8")
+
+
+def _layout_only(resume, theme, photo_dir):
+    layout_resume(resume, get_plan(theme), photo_dir)
+    return b""
+
+
+BACKENDS = {"pdf": _render_pdf, "png": _render_png, "html": _render_html, "layout": _layout_only}
+
+
+def percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS, KiB elsewhere
+
+
+def run_case(backend, theme, size, with_photo, iterations, warmup, photo_dir, photo):
+    resume = sample_resume(size, size, photo if with_photo else None)
+    render = BACKENDS[backend]
+    for _ in range(warmup):
+        render(resume, theme, photo_dir)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        output = render(resume, theme, photo_dir)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "backend": backend,
+        "theme": theme,
+        "size": size,
+        "photo": with_photo,
+        "iterations": iterations,
+        "p50Ms": round(percentile(timings, 50), 3),
+        "p90Ms": round(percentile(timings, 90), 3),
+        "p99Ms": round(percentile(timings, 99), 3),
+        "maxMs": round(timings[-1], 3),
+        "meanMs": round(statistics.fmean(timings), 3),
+        "bytes": len(output),
+        "pages": len(layout_resume(resume, get_plan(theme), photo_dir).pages),
+        "peakRssKb": peak_rss_kb(),
+    }
+
+
+def case_id(case) -> str:
+    return f"{case['backend']}/{case['theme']}/{case['size']}/{'photo' if case['photo'] else 'nophoto'}"
+
+
+def run_isolated(args, theme, size, with_photo):
+    command = [sys.executable, os.path.abspath(__file__), "--backend", args.backend, "--themes", theme,
+               "--sizes", str(size), "--photo", "yes" if with_photo else "no",
+               "--iterations", str(args.iterations), "--warmup", str(args.warmup), "--json", "-", "--quiet"]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)["cases"][0]
+
+
+def compare(cases, baseline_path, threshold) -> bool:
+    with open(baseline_path) as f:
+        baseline = {case_id(case): case for case in json.load(f)["cases"]}
+    ok = True
+    print(f"\n{'case':<40}{'base p50':>10}{'p50':>10}{'ratio':>8}")
+    for case in cases:
+        base = baseline.get(case_id(case))
+        if base is None:
+            continue
+        ratio = case["p50Ms"] / base["p50Ms"] if base["p50Ms"] else 1.0
+        flag = ""
+        if ratio > threshold:
+            flag, ok = "  REGRESSION", False
+        print(f"{case_id(case):<40}{base['p50Ms']:>10.2f}{case['p50Ms']:>10.2f}{ratio:>8.2f}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="pdf")
+    parser.add_argument("--themes", default=",".join(STYLES), help="comma-separated theme names")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated work experience/education counts")
+    parser.add_argument("--photo", choices=("both", "yes", "no"), default="both")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--isolate", action="store_true", help="run each case in a fresh interpreter")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON from a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="allowed p50 slowdown for --compare")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    themes = [t for t in args.themes.split(",") if t]
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    photos = {"both": (False, True), "yes": (True,), "no": (False,)}[args.photo]
+
+    cases = []
+    with tempfile.TemporaryDirectory() as photo_dir:
+        photo = make_sample_photo(photo_dir)
+        for theme in themes:
+            for size in sizes:
+                for with_photo in photos:
+                    if args.isolate:
+                        case = run_isolated(args, theme, size, with_photo)
+                    else:
+                        case = run_case(args.backend, theme, size, with_photo, args.iterations, args.warmup,
+                                        photo_dir, photo)
+                    cases.append(case)
+                    if not args.quiet:
+                        print(f"{case_id(case):<40} p50 {case['p50Ms']:8.2f}  p90 {case['p90Ms']:8.2f}  "
+                              f"p99 {case['p99Ms']:8.2f} ms  {case['bytes']:>8} B  {case['pages']:>3} pages  "
+                              f"rss {case['peakRssKb'] // 1024} MiB")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "cases": cases,
+    }
+    if args.json == "-":
+        json.dump(report, sys.stdout)
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare and not compare(cases, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Check that resume queries are answered from an index.
+
+    python scripts/explain_queries.py [-v]
+
+Creates the schema in a temporary SQLite database and runs EXPLAIN QUERY
+PLAN on every combination of the resume filter endpoint's fields and on
+the per-user and per-resume lookups the API makes. Exits with status 1 if
+any plan scans a whole table or sorts rows instead of reading them in index
+order.
+"""
+import datetime
+import itertools
+import os
+import re
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FILTER_VALUES = {
+    "city": "Москва",
+    "salary_min": 50000,
+    "salary_max": 150000,
+    "employment": "Полная",
+    "work_schedule": "5/2",
+    "can_relocate": True,
+}
+# "SCAN resumes" is a full table scan; "SEARCH ... USING INDEX" is fine
+FULL_SCAN = re.compile(r"\bSCAN (\w+)(?! USING (COVERING )?INDEX)")
+# The ORDER BY isn't covered by the index, so every match is sorted
+TEMP_SORT = re.compile(r"\bUSE TEMP B-TREE\b")
+
+
+def queries():
+    from sqlalchemy import select, tuple_
+    from database import Resume, WorkExperience, Education, ResumePhoto, PdfJob
+    from filters import filter_pages, public_resume_filter
+
+    for n in range(len(FILTER_VALUES) + 1):
+        for names in itertools.combinations(FILTER_VALUES, n):
+            kwargs = {name: FILTER_VALUES[name] for name in names}
+            yield f"filter({', '.join(names) or 'no fields'})", public_resume_filter(**kwargs).limit(20)
+    for city in (None, FILTER_VALUES["city"]):
+        where = "city" if city else "no fields"
+        for after in ((FILTER_VALUES["salary_min"], "x"), (None, "x")):
+            pages = filter_pages(public_resume_filter(city=city), after)
+            for i, query in enumerate(pages, 1):
+                yield f"filter({where}), after {after[0]}, query {i} of {len(pages)}", query.limit(20)
+    my_resumes = select(Resume).where(Resume.user_id == "u").order_by(Resume.created_at, Resume.id)
+    yield "my resumes", my_resumes
+    yield "my resumes, next page", (
+        my_resumes.where(tuple_(Resume.created_at, Resume.id) > tuple_(datetime.datetime(2024, 1, 1), "x")).limit(101)
+    )
+    yield "work experiences of a resume", select(WorkExperience).where(WorkExperience.resume_id == "r")
+    yield "educations of a resume", select(Education).where(Education.resume_id == "r")
+    yield "photo of a resume", select(ResumePhoto).where(ResumePhoto.resume_id == "r")
+    yield "pdf job dedup", select(PdfJob).where(PdfJob.user_id == "u", PdfJob.dedup_key == "k")
+    yield "pdf jobs of a resume", select(PdfJob.result_path).where(PdfJob.resume_id == "r")
+
+
+def query_plan(conn, query) -> list:
+    compiled = query.compile(conn.engine, compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")]
+
+
+def plan_problems(plan) -> list:
+    """Lines of a query plan that scan a whole table or sort in a temporary b-tree."""
+    return [line for line in plan if FULL_SCAN.search(line) or TEMP_SORT.search(line)]
+
+
+def main():
+    verbose = "-v" in sys.argv
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'explain.db')}"
+        from database import engine
+        from migrate import upgrade
+
+        upgrade(engine, log=lambda message: None)
+
+        failures = 0
+        with engine.connect() as conn:
+            for name, query in queries():
+                plan = query_plan(conn, query)
+                problems = plan_problems(plan)
+                failures += bool(problems)
+                if problems or verbose:
+                    print(f"{'FAIL' if problems else 'ok':<10}{name}")
+                    for line in plan:
+                        print(f"{'':<12}{line}")
+        engine.dispose()
+
+    if failures:
+        print(f"{failures} queries scan a whole table or sort their result")
+        sys.exit(1)
+    print("All queries read in index order")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""HTTP load harness for the API against a seeded SQLite database.
+
+    python scripts/load_test.py --users 50 --resumes 5 --concurrency 16 --duration 30
+
+Seeds a fresh SQLite file with N users and M resumes each, starts uvicorn
+on it, logs every virtual user in and then drives a weighted mix of login,
+resume listing, resume updates and PDF downloads for --duration seconds.
+Reports requests per second, latency percentiles and histogram, and error
+rates per endpoint; --json writes the same numbers for comparison between
+runs. Only the standard library is used on the client side.
+
+Pass --url to load an already running server instead; it must be using
+the database given with --db (seed it once with --seed-only).
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = "load-test-password"
+# endpoint -> relative weight in the request mix
+DEFAULT_MIX = {"login": 5, "my": 45, "update": 15, "pdf": 35}
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def seed(database_path: str, users: int, resumes_per_user: int, entries: int):
+    """Create the schema in a fresh database and fill it; returns [(email, [resume ids])]."""
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{database_path}"
+    from database import engine, SessionLocal, User, Resume, WorkExperience, Education
+    from migrate import upgrade
+    from pdf import RESUME_FIELDS
+    from sample_data import sample_resume
+    from security import get_password_hash
+
+    upgrade(engine, log=lambda message: None)
+    password_hash = get_password_hash(PASSWORD)  # bcrypt is slow; every user shares one hash
+    cities = ("Москва", "Санкт-Петербург", "Казань", "Новосибирск", "Екатеринбург")
+    themes = ("modern", "classic", "creative", "professional", "elegant")
+    accounts = []
+    with SessionLocal() as db:
+        for u in range(users):
+            user = User(name=f"load{u}", email=f"load{u}@example.com", password_hash=password_hash)
+            db.add(user)
+            db.flush()
+            resume_ids = []
+            for r in range(resumes_per_user):
+                sample = sample_resume(entries, max(1, entries // 2), text_repeat=2)
+                fields = {f: getattr(sample, f) for f in RESUME_FIELDS if f != "id"}
+                fields.update(title=f"Resume {r}", theme=themes[(u + r) % len(themes)], isPublic=r % 2 == 0,
+                              city=cities[(u * 7 + r) % len(cities)], desiredSalary=50000 + 5000 * ((u + r) % 30))
+                resume = Resume(user_id=user.id, **fields)
+                resume.work_experiences = [WorkExperience(**vars(we)) for we in sample.work_experiences]
+                resume.educations = [Education(**vars(edu)) for edu in sample.educations]
+                db.add(resume)
+                db.flush()
+                resume_ids.append(resume.id)
+            accounts.append((user.email, resume_ids))
+            if u % 100 == 99:
+                db.commit()
+        db.commit()
+    return accounts
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self.lock = threading.Lock()
+
+    def record(self, endpoint: str, status, elapsed_ms: float):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(elapsed_ms)
+            counts = self.statuses.setdefault(endpoint, {})
+            counts[status] = counts.get(status, 0) + 1
+
+
+class VirtualUser:
+    def __init__(self, host: str, port: int, email: str, resume_ids, stats: Stats):
+        self.host, self.port = host, port
+        self.email = email
+        self.resume_ids = resume_ids
+        self.stats = stats
+        self.cookie = None
+        self.conn = None
+        self.updates = 0
+
+    def request(self, endpoint: str, method: str, path: str, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        start = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self.conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as ex:
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = None
+            response, status = None, type(ex).__name__
+        self.stats.record(endpoint, status, (time.perf_counter() - start) * 1000)
+        return response
+
+    def login(self):
+        response = self.request("login", "POST", "/api/Auth/login", {"Login": self.email, "Password": PASSWORD})
+        if response is not None and response.status == 200:
+            for header, value in response.getheaders():
+                if header.lower() == "set-cookie" and value.startswith("access_token="):
+                    self.cookie = value.split(";", 1)[0]
+
+    def step(self, endpoint: str):
+        if endpoint == "login" or self.cookie is None:
+            self.login()
+        elif endpoint == "my":
+            self.request("my", "GET", "/api/Resume/my?view=summary")
+        elif endpoint == "update":
+            self.updates += 1
+            resume_id = random.choice(self.resume_ids)
+            self.request("update", "PUT", f"/api/Resume/{resume_id}", {"title": f"Updated {self.updates}"})
+        elif endpoint == "pdf":
+            self.request("pdf", "GET", f"/api/Resume/{random.choice(self.resume_ids)}/pdf")
+
+
+def drive(host, port, accounts, mix, concurrency, duration, stats):
+    endpoints, weights = zip(*mix.items())
+    users = [VirtualUser(host, port, email, ids, stats) for email, ids in accounts if ids]
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        mine = users[index::concurrency]
+        for user in mine:
+            user.login()
+        while time.monotonic() < deadline:
+            user = random.choice(mine)
+            user.step(random.choices(endpoints, weights)[0])
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(min(concurrency, len(users)))]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.monotonic() - started
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, round(q / 100 * (len(sorted_values) - 1)))]
+
+
+def summarize(stats: Stats, elapsed: float):
+    report = {}
+    for endpoint, latencies in sorted(stats.latencies.items()):
+        latencies = sorted(latencies)
+        statuses = stats.statuses[endpoint]
+        errors = sum(count for status, count in statuses.items() if not (isinstance(status, int) and status < 400))
+        histogram = {}
+        for bound in BUCKETS_MS + (float("inf"),):
+            label = f"<={bound}ms" if bound != float("inf") else f">{BUCKETS_MS[-1]}ms"
+            histogram[label] = sum(1 for v in latencies if v <= bound) - sum(histogram.values())
+        report[endpoint] = {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / elapsed, 2),
+            "errorRate": round(errors / len(latencies), 4),
+            "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+            "p50Ms": round(percentile(latencies, 50), 2),
+            "p90Ms": round(percentile(latencies, 90), 2),
+            "p99Ms": round(percentile(latencies, 99), 2),
+            "maxMs": round(latencies[-1], 2),
+            "meanMs": round(statistics.fmean(latencies), 2),
+            "histogram": histogram,
+        }
+    return report
+
+
+def print_report(report, elapsed):
+    total = sum(r["requests"] for r in report.values())
+    print(f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s")
+    print(f"{'endpoint':<10}{'reqs':>8}{'rps':>9}{'err%':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  statuses")
+    for endpoint, r in report.items():
+        print(f"{endpoint:<10}{r['requests']:>8}{r['rps']:>9.1f}{r['errorRate'] * 100:>7.1f}"
+              f"{r['p50Ms']:>9.1f}{r['p90Ms']:>9.1f}{r['p99Ms']:>9.1f}{r['maxMs']:>9.1f}  {r['statuses']}")
+    for endpoint, r in report.items():
+        print(f"\n{endpoint} latency histogram")
+        peak = max(r["histogram"].values()) or 1
+        for label, count in r["histogram"].items():
+            print(f"  {label:>10} {count:>7} {'#' * round(40 * count / peak)}")
+
+
+def wait_for_server(host, port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not become healthy")
+
+
+def parse_mix(value: str):
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, value.split(",")):
+        name, weight = item.split("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name}")
+        mix[name] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--resumes", type=int, default=5, help="resumes per user")
+    parser.add_argument("--entries", type=int, default=3, help="work experiences per resume")
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load, including the initial logins")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="weights, e.g. login=5,my=45,update=15,pdf=35")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", help="SQLite file to seed (default: a temporary file)")
+    parser.add_argument("--url", help="load this running server instead of starting uvicorn")
+    parser.add_argument("--seed-only", action="store_true")
+    parser.add_argument("--json", metavar="PATH", help="write the report as JSON")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    database_path = os.path.abspath(args.db or os.path.join(workdir, "loadtest.db"))
+    if os.path.exists(database_path) and not args.url:
+        os.remove(database_path)
+    process = None
+    try:
+        print(f"Seeding {args.users} users x {args.resumes} resumes into {database_path}")
+        accounts = seed(database_path, args.users, args.resumes, args.entries)
+        if args.seed_only:
+            return
+
+        if args.url:
+            parsed = urllib.parse.urlsplit(args.url)
+            host, port = parsed.hostname, parsed.port or 80
+        else:
+            host, port = "127.0.0.1", args.port
+            env = dict(os.environ, SQLALCHEMY_DATABASE_URL=f"sqlite+aiosqlite:///{database_path}")
+            process = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--host", host, "--port", str(port),
+                 "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+                cwd=ROOT, env=env,
+            )
+        wait_for_server(host, port, process)
+
+        stats = Stats()
+        print(f"Driving {args.concurrency} clients for {args.duration:.0f}s, mix {args.mix}")
+        elapsed = drive(host, port, accounts, args.mix, args.concurrency, args.duration, stats)
+        report = summarize(stats, elapsed)
+        print_report(report, elapsed)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"elapsedSeconds": round(elapsed, 2), "config": vars(args) | {"mix": args.mix},
+                           "endpoints": report}, f, indent=2)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
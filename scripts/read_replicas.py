@@ -0,0 +1,168 @@
+"""Check read-replica routing locally, with SQLite files standing in for replicas.
+
+    python scripts/read_replicas.py
+
+Migrates a temporary primary database, copies it to two replica files and
+starts uvicorn with DB_READ_REPLICA_URLS pointing at read-only connections
+to them. "Replication" is an explicit copy, so a replica is as far behind
+as the script wants. Then it checks, step by step:
+
+- a client reads its own write right after making it (read-your-writes);
+- without the read-your-writes cookie, reads come from the stale replicas,
+  which take turns;
+- after copying again, the replicas serve the new data;
+- with one replica gone, the other serves every read;
+- with both gone, reads fall back to the primary;
+- a replica that comes back is used again after DB_REPLICA_RETRY_INTERVAL.
+
+Exits with status 1 at the first failed check.
+"""
+import http.client
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from http.cookies import SimpleCookie
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_test import wait_for_server  # noqa: E402
+
+RETRY_INTERVAL = 2
+READ_YOUR_WRITES_SECONDS = 3
+# Replica connections are recycled this often, so a removed replica file is noticed quickly
+POOL_RECYCLE = 1
+
+
+def replicate(primary: str, replica: str):
+    """Copy the primary into the replica file in place, as replication would catch it up."""
+    with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+        source.backup(target)
+        # Read-only connections can't open a WAL database without its -shm file
+        target.execute("PRAGMA journal_mode = DELETE")
+    target.close()
+    source.close()
+
+
+class Client:
+    def __init__(self, host: str, port: int):
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+        self.cookies = {}
+
+    def request(self, method: str, path: str, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        self.conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = self.conn.getresponse()
+        data = response.read()
+        for header, value in response.getheaders():
+            if header.lower() == "set-cookie":
+                for name, morsel in SimpleCookie(value).items():
+                    self.cookies[name] = morsel.value
+        return response.status, json.loads(data) if data else None
+
+
+def check(condition: bool, description: str):
+    print(f"{'ok' if condition else 'FAIL':<6}{description}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="replicas-")
+    primary = os.path.join(workdir, "primary.db")
+    replicas = [os.path.join(workdir, "replica1.db"), os.path.join(workdir, "replica2.db")]
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{primary}"
+    from database import engine
+    from migrate import upgrade
+
+    upgrade(engine, log=lambda message: None)
+    engine.dispose()
+    for replica in replicas:
+        replicate(primary, replica)
+
+    host, port = "127.0.0.1", 8766
+    env = dict(
+        os.environ,
+        DB_READ_REPLICA_URLS=",".join(f"sqlite:///file:{replica}?mode=ro&uri=true" for replica in replicas),
+        DB_REPLICA_RETRY_INTERVAL=str(RETRY_INTERVAL),
+        DB_READ_YOUR_WRITES_SECONDS=str(READ_YOUR_WRITES_SECONDS),
+        DB_POOL_RECYCLE=str(POOL_RECYCLE),
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", host, "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        wait_for_server(host, port, process)
+        client = Client(host, port)
+
+        def my_resumes():
+            status, body = client.request("GET", "/api/Resume/my?view=summary")
+            if status != 200:
+                check(False, f"GET /api/Resume/my returned {status}: {body}")
+            return len(body)
+
+        def replica_stats():
+            return client.request("GET", "/health")[1]["readReplicas"]
+
+        status, _ = client.request("POST", "/api/Auth/register",
+                                   {"Name": "replica", "Email": "replica@example.com", "Password": "replica-password"})
+        check(status == 200, "register")
+        for replica in replicas:
+            replicate(primary, replica)
+
+        status, _ = client.request("POST", "/api/Resume", {
+            "title": "Replicated", "isPublic": True, "lastName": "L", "firstName": "F",
+            "birthDate": "1990-01-01T00:00:00", "email": "e@example.com", "position": "Developer",
+            "employment": "full", "workSchedule": "5/2", "city": "Moscow", "citizenship": "RU",
+        })
+        check(status == 200, "create a resume on the primary")
+        check(my_resumes() == 1, "the new resume is read back right away (read-your-writes cookie)")
+
+        client.cookies.pop("db_primary_until")
+        before = replica_stats()
+        check(all(my_resumes() == 0 for _ in range(4)), "without the cookie, reads come from the stale replicas")
+        after = replica_stats()
+        served = [a["served"] - b["served"] for a, b in zip(after["replicas"], before["replicas"])]
+        check(all(count >= 2 for count in served), f"the replicas take turns (served {served})")
+
+        for replica in replicas:
+            replicate(primary, replica)
+        check(my_resumes() == 1, "after replication, the replicas serve the resume")
+
+        os.remove(replicas[0])
+        time.sleep(POOL_RECYCLE + 0.5)
+        check(all(my_resumes() == 1 for _ in range(4)), "with replica 1 gone, reads keep working")
+        stats = replica_stats()
+        check(not stats["replicas"][0]["healthy"] and stats["replicas"][1]["healthy"],
+              f"replica 1 is marked down ({stats['replicas'][0]['lastError']})")
+
+        os.remove(replicas[1])
+        time.sleep(POOL_RECYCLE + 0.5)
+        fallbacks = replica_stats()["primaryFallbacks"]
+        check(my_resumes() == 1, "with both replicas gone, reads fall back to the primary")
+        check(replica_stats()["primaryFallbacks"] > fallbacks, "the fallback is counted in /health")
+
+        replicate(primary, replicas[0])
+        time.sleep(RETRY_INTERVAL + 0.5)
+        served = replica_stats()["replicas"][0]["served"]
+        check(all(my_resumes() == 1 for _ in range(2)), "reads work once replica 1 is back")
+        stats = replica_stats()
+        check(stats["replicas"][0]["healthy"] and stats["replicas"][0]["served"] > served,
+              "replica 1 serves reads again after the retry interval")
+        print("All read-replica checks passed")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Synthetic resumes for the benchmark scripts."""
+import datetime
+import os
+from types import SimpleNamespace
+
+from PIL import Image, ImageDraw
+
+from pdf import RESUME_FIELDS
+
+
+def sample_resume(work_experiences=3, educations=2, photo_filename=None, text_repeat=6):
+    """A resume snapshot (see ``pdf.snapshot_resume``) with the given number of entries."""
+    resume = SimpleNamespace(**{field: None for field in RESUME_FIELDS})
+    resume.__dict__.update(
+        id="bench", title="Benchmark", theme="modern", isPublic=True,
+        lastName="Петров", firstName="Иван", middleName="Сергеевич", birthDate=datetime.datetime(1990, 5, 17),
+        phoneNumber="+7 999 123-45-67", email="ivan.petrov@example.com", position="Инженер-программист",
+        employment="Полная", desiredSalary=150000, workSchedule="5/2", isReadyForTrips=True, city="Москва",
+        canRelocate=False, citizenship="РФ", gender="Мужской", hasChildren=False, languages="Русский, English",
+        driverLicenses="B", hasMedicalBook=True, personalQualities="Ответственный, внимательный к деталям",
+    )
+    resume.work_experiences = [
+        SimpleNamespace(
+            organization=f"ООО Компания {i + 1}", position="Разработчик",
+            startDate=datetime.datetime(2010 + i, 1, 1), endDate=None if i == 0 else datetime.datetime(2011 + i, 6, 1),
+            responsibilities="Проектирование и разработка сервисов, ревью кода, наставничество. " * text_repeat,
+        )
+        for i in range(work_experiences)
+    ]
+    resume.educations = [
+        SimpleNamespace(institution=f"Университет {i + 1}", faculty="ВМК", specialty="Прикладная математика",
+                        graduationYear=2005 + i, studyForm="Очная")
+        for i in range(educations)
+    ]
+    resume.photo = SimpleNamespace(filename=photo_filename) if photo_filename else None
+    return resume
+
+
+def make_sample_photo(photo_dir: str, filename="bench.jpg", size=(1200, 1600)) -> str:
+    """Write a synthetic portrait JPEG plus its per-theme variants; returns the filename."""
+    from photos import derive_photo_variants
+
+    os.makedirs(photo_dir, exist_ok=True)
+    img = Image.new("RGB", size, (70, 110, 160))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, size[0], 40):
+        draw.line((i, 0, size[0] - i, size[1]), fill=(200, 180 - i % 120, 90), width=9)
+    draw.ellipse((size[0] // 4, size[1] // 5, size[0] * 3 // 4, size[1] * 3 // 5), fill=(230, 200, 170))
+    path = os.path.join(photo_dir, filename)
+    img.save(path, "JPEG", quality=90)
+    derive_photo_variants(path)
+    return filename
@@ -0,0 +1,174 @@
+"""Check that SQLite writers queue instead of failing, and readers keep up under write load.
+
+    python scripts/sqlite_concurrency.py [--writers 4] [--readers 8] [--duration 5]
+
+Migrates a temporary SQLite database and uses the app's engines on it:
+
+1. Holds a write transaction open (get_write_db's engine) for --hold
+   seconds. A write from another process must wait for the lock and succeed
+   once it is released rather than fail with "database is locked".
+2. Runs --writers processes doing short read-then-write transactions for
+   --duration seconds while --readers coroutines keep reading; no write
+   may fail.
+
+Exits with status 1 if any check fails. That reads don't wait for an open
+write transaction is checked by tests/test_sqlite_concurrency.py.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def writer(database_url: str, duration: float, hold: float, pause: float, results, ready=None, go=None):
+    """Repeat read-then-write transactions for ``duration`` seconds (at least one).
+
+    With ``ready`` and ``go``, signal once imported and wait for ``go`` before starting.
+    """
+    os.environ["SQLALCHEMY_DATABASE_URL"] = database_url
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import func, select
+    from database import AsyncWriteSessionLocal, User
+
+    if ready is not None:
+        ready.set()
+        go.wait()
+
+    async def run():
+        commits, errors = 0, []
+        deadline = time.monotonic() + duration
+        while True:
+            start = time.monotonic()
+            try:
+                async with AsyncWriteSessionLocal() as db:
+                    # Read, then write in the same transaction: the case BEGIN IMMEDIATE protects
+                    count = await db.scalar(select(func.count()).select_from(User))
+                    db.add(User(name=f"writer-{count}", email=f"{os.getpid()}-{commits}@example.com"))
+                    await db.flush()
+                    await asyncio.sleep(hold)
+                    await db.commit()
+                commits += 1
+            except Exception as ex:
+                errors.append(f"{type(ex).__name__}: {ex}".splitlines()[0])
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(pause)
+        results.put((commits, errors, time.monotonic() - start))
+
+    asyncio.run(run())
+
+
+async def read_loop(deadline: float, latencies, seen_emails, errors):
+    from sqlalchemy import func, select
+    from database import AsyncSessionLocal, User
+
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.scalar(select(func.count()).select_from(User))
+                seen_emails.update((await db.scalars(select(User.email))).all())
+        except Exception as ex:
+            errors.append(f"{type(ex).__name__}: {ex}".splitlines()[0])
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def read_for(readers: int, duration: float):
+    latencies, seen_emails, errors = [], set(), []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(read_loop(deadline, latencies, seen_emails, errors) for _ in range(readers)))
+    return sorted(latencies), seen_emails, errors
+
+
+async def hold_write_lock(hold: float, go):
+    """Keep a write transaction open for ``hold`` seconds once ``go`` is set."""
+    from database import AsyncWriteSessionLocal, User
+
+    async with AsyncWriteSessionLocal() as db:
+        db.add(User(name="holder", email="holder@example.com"))
+        await db.flush()
+        go.set()
+        await asyncio.sleep(hold)
+        await db.commit()
+
+
+def summary(latencies) -> str:
+    if not latencies:
+        return "no reads"
+    p99 = latencies[min(len(latencies) - 1, round(0.99 * (len(latencies) - 1)))]
+    return f"{len(latencies)} reads, p99 {p99 * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4, help="writer processes")
+    parser.add_argument("--readers", type=int, default=8, help="concurrent reads in this process")
+    parser.add_argument("--duration", type=float, default=5, help="seconds of mixed load")
+    parser.add_argument("--hold", type=float, default=2, help="seconds the write lock is held in the first check")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = f"sqlite:///{os.path.join(workdir, 'concurrency.db')}"
+        os.environ["SQLALCHEMY_DATABASE_URL"] = database_url
+        from database import SQLITE_PRAGMAS, engine
+        from migrate import upgrade
+
+        upgrade(engine, log=lambda message: None)
+        print(f"Pragmas: {SQLITE_PRAGMAS}")
+        asyncio.run(read_for(args.readers, 0.5))  # open the read connections up front
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+
+        # 1. A second writer waiting for an open write transaction
+        ready, go = context.Event(), context.Event()
+        blocked = context.Process(target=writer, args=(database_url, 0, 0, 0, results, ready, go))
+        blocked.start()
+        ready.wait()
+        asyncio.run(hold_write_lock(args.hold, go))
+        commits, errors, waited = results.get()
+        blocked.join()
+        print(f"Write lock held {args.hold:.1f}s; second writer: {commits} commits, {len(errors)} errors, took {waited:.2f}s")
+        failures += [f"second writer: {error}" for error in errors]
+        if waited < args.hold / 2:
+            failures.append("the second writer did not wait for the open write transaction")
+
+        # 2. Mixed load from several processes
+        go = context.Event()
+        processes = []
+        for _ in range(args.writers):
+            ready = context.Event()
+            processes.append(context.Process(
+                target=writer, args=(database_url, args.duration, 0.02, 0.05, results, ready, go)))
+            processes[-1].start()
+            ready.wait()
+        go.set()
+        latencies, _, read_errors = asyncio.run(read_for(args.readers, args.duration))
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        engine.dispose()
+
+    errors = [error for _, errs, _ in outcomes for error in errs]
+    print(f"Mixed load: {sum(c for c, _, _ in outcomes)} commits from {args.writers} processes, "
+          f"{len(errors)} errors; {summary(latencies)}")
+    failures += [f"writer: {error}" for error in sorted(set(errors))]
+    failures += [f"read: {error}" for error in sorted(set(read_errors))]
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: writers queued for the lock and no write failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Full-text index over public resumes.
+
+SQLite keeps the text in an FTS5 table (``resume_search``) whose rowids map
+to resume ids through ``resume_search_rows``; Postgres keeps one weighted
+tsvector per resume with a GIN index. Either way the index holds public
+resumes only and is updated in the same transaction as the resume.
+
+    python search.py --rebuild    # re-index every public resume
+"""
+import argparse
+import os
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from database import engine, Resume, WorkExperience
+from migrate import backfill_in_batches
+
+# Text search configuration for the Postgres path
+SEARCH_PG_CONFIG = os.getenv("SEARCH_PG_CONFIG", "simple")
+SEARCH_MAX_TERMS = 8
+# The last word of a query is matched as a prefix (search as you type) once
+# it has this many characters; shorter prefixes expand to too many terms.
+SEARCH_MIN_PREFIX = 3
+
+# Column weights for bm25 (SQLite); Postgres uses the A-D labels below
+SQLITE_WEIGHTS = "10.0, 2.0, 4.0, 1.0"
+
+
+def search_document(resume, work_experiences) -> dict:
+    """The indexed text of a resume, by field group."""
+    def join(*parts):
+        return " ".join(p for p in parts if p)
+
+    return {
+        "position": join(resume.position, *(we.position for we in work_experiences)),
+        "city": resume.city or "",
+        "skills": join(resume.languages, resume.personalQualities),
+        "experience": join(*(join(we.organization, we.responsibilities) for we in work_experiences)),
+    }
+
+
+def _delete_sql(dialect_name: str):
+    if dialect_name == "postgresql":
+        return [text("DELETE FROM resume_search WHERE resume_id = :resume_id")]
+    return [
+        text("DELETE FROM resume_search WHERE rowid = (SELECT id FROM resume_search_rows WHERE resume_id = :resume_id)"),
+        text("DELETE FROM resume_search_rows WHERE resume_id = :resume_id"),
+    ]
+
+
+def _insert_sql(dialect_name: str):
+    if dialect_name == "postgresql":
+        return [text(
+            "INSERT INTO resume_search (resume_id, document) VALUES (:resume_id, "
+            "setweight(to_tsvector(CAST(:config AS regconfig), :position), 'A') || "
+            "setweight(to_tsvector(CAST(:config AS regconfig), :skills), 'B') || "
+            "setweight(to_tsvector(CAST(:config AS regconfig), :city), 'C') || "
+            "setweight(to_tsvector(CAST(:config AS regconfig), :experience), 'D'))"
+        )]
+    return [
+        text("INSERT INTO resume_search_rows (resume_id) VALUES (:resume_id)"),
+        text("INSERT INTO resume_search (rowid, position, city, skills, experience) VALUES "
+             "((SELECT id FROM resume_search_rows WHERE resume_id = :resume_id), :position, :city, :skills, :experience)"),
+    ]
+
+
+async def remove_from_search_index(db: AsyncSession, resume_id: str):
+    for statement in _delete_sql(db.bind.dialect.name):
+        await db.execute(statement, {"resume_id": resume_id})
+
+
+async def update_search_index(db: AsyncSession, resume: Resume):
+    """Re-index a resume (or drop it if it isn't public); call before the commit that saves it."""
+    await db.flush()
+    await remove_from_search_index(db, resume.id)
+    if not resume.isPublic:
+        return
+    work_experiences = (await db.scalars(select(WorkExperience).where(WorkExperience.resume_id == resume.id))).all()
+    params = {"resume_id": resume.id, "config": SEARCH_PG_CONFIG, **search_document(resume, work_experiences)}
+    for statement in _insert_sql(db.bind.dialect.name):
+        await db.execute(statement, params)
+
+
+def search_terms(query: str) -> List[Tuple[str, bool]]:
+    """(word, match as prefix) pairs of a free-text query."""
+    words = re.findall(r"\w+", query.lower())[:SEARCH_MAX_TERMS]
+    return [(word, i == len(words) - 1 and len(word) >= SEARCH_MIN_PREFIX) for i, word in enumerate(words)]
+
+
+def search_cursor(resume_id: str, score: float) -> str:
+    return f"{score!r},{resume_id}"
+
+
+def parse_search_cursor(cursor: str) -> Tuple[float, str]:
+    """(score, resume id) of the last hit of the previous page; ValueError if malformed."""
+    score, resume_id = cursor.split(",", 1)
+    return float(score), resume_id
+
+
+async def search_resumes(db: AsyncSession, query: str, city: Optional[str] = None, limit: int = 20,
+                         after: Optional[Tuple[float, str]] = None) -> List[Tuple[str, float]]:
+    """Ids and scores of public resumes matching every word of ``query``, best first.
+
+    Ties are broken by id, and ``after`` (a ``parse_search_cursor`` result)
+    continues from a previous page's last hit, however deep.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    params = {"limit": limit, "city": city}
+    city_filter = " AND r.city = :city" if city else ""
+    if db.bind.dialect.name == "postgresql":
+        params.update(config=SEARCH_PG_CONFIG, tsquery=" & ".join(f"{t}:*" if prefix else t for t, prefix in terms))
+        sql = (
+            "SELECT s.resume_id, ts_rank_cd(s.document, q) AS score "
+            "FROM resume_search s JOIN resumes r ON r.id = s.resume_id, "
+            "to_tsquery(CAST(:config AS regconfig), :tsquery) q "
+            f"WHERE s.document @@ q{city_filter}"
+        )
+    else:
+        params["match"] = " ".join(f'"{t}"*' if prefix else f'"{t}"' for t, prefix in terms)
+        sql = (
+            f"SELECT m.resume_id, -bm25(resume_search, {SQLITE_WEIGHTS}) AS score "
+            "FROM resume_search JOIN resume_search_rows m ON m.id = resume_search.rowid "
+            + ("JOIN resumes r ON r.id = m.resume_id " if city else "") +
+            f"WHERE resume_search MATCH :match{city_filter}"
+        )
+    # Keyset on (score, id): the next page starts after the previous page's last hit
+    keyset = ""
+    if after is not None:
+        params.update(after_score=after[0], after_id=after[1])
+        keyset = "WHERE score < :after_score OR (score = :after_score AND resume_id > :after_id) "
+    sql = f"SELECT resume_id, score FROM ({sql}) hits {keyset}ORDER BY score DESC, resume_id LIMIT :limit"
+    rows = (await db.execute(text(sql), params)).all()
+    return [(resume_id, float(score)) for resume_id, score in rows]
+
+
+def _index_batch(db: Session, resume_ids):
+    dialect_name = db.bind.dialect.name
+    resumes = db.scalars(
+        select(Resume).options(selectinload(Resume.work_experiences)).where(Resume.id.in_(resume_ids))
+    ).all()
+    for resume in resumes:
+        for statement in _delete_sql(dialect_name):
+            db.execute(statement, {"resume_id": resume.id})
+        params = {"resume_id": resume.id, "config": SEARCH_PG_CONFIG, **search_document(resume, resume.work_experiences)}
+        for statement in _insert_sql(dialect_name):
+            db.execute(statement, params)
+
+
+def index_public_resumes(bind, batch_size: Optional[int] = None) -> int:
+    """(Re-)index every public resume in throttled batches, leaving the rest of the index in place."""
+    return backfill_in_batches(bind, "resumes", "id", _index_batch, where='"isPublic" = true', batch_size=batch_size)
+
+
+def rebuild_search_index(bind, batch_size: Optional[int] = None) -> int:
+    """Index every public resume from scratch."""
+    with bind.begin() as conn:
+        conn.execute(text("DELETE FROM resume_search"))
+        if bind.dialect.name != "postgresql":
+            conn.execute(text("DELETE FROM resume_search_rows"))
+    return index_public_resumes(bind, batch_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the resume full-text index")
+    parser.add_argument("--rebuild", action="store_true", help="re-index every public resume")
+    args = parser.parse_args()
+    if args.rebuild:
+        print(f"Indexed {rebuild_search_index(engine)} public resumes")
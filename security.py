@@ -1,9 +1,102 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
+import os
+import threading
+import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_QUEUE_DEPTH = int(os.getenv("PASSWORD_HASH_QUEUE_DEPTH", 64))
+
+# Hashes made with a different cost than BCRYPT_ROUNDS report needs_update and
+# are re-hashed on the next successful login.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password) 
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL, so threads give real parallelism. At most
+    ``workers + queue_depth`` calls are admitted at once; the rest are
+    rejected with PasswordHasherBusy.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_depth: int = PASSWORD_HASH_QUEUE_DEPTH):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _run(self, fn, args, submitted_at):
+        started_at = time.monotonic()
+        with self._lock:
+            self._pending -= 1
+            self._active += 1
+            self._wait_seconds += started_at - submitted_at
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                self._run_seconds += time.monotonic() - started_at
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending + self._active >= self.workers + self.queue_depth:
+                self._rejected += 1
+                raise PasswordHasherBusy()
+            self._pending += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, fn, args, time.monotonic())
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Returns ``(valid, new_hash)``; ``new_hash`` is set when the stored hash uses stale parameters."""
+        return await self._submit(verify_and_update_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "pending": self._pending,
+                "active": self._active,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_seconds / completed * 1000, 2) if completed else 0.0,
+                "avg_run_ms": round(self._run_seconds / completed * 1000, 2) if completed else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,73 @@
+"""Tests run against a throwaway SQLite database, migrated once per session.
+
+The database URL has to be set before anything imports ``database``.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix="tests-")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'test.db')}"
+os.environ["DB_AUTO_MIGRATE"] = "0"
+os.environ["DB_READ_REPLICA_URLS"] = ""
+
+
+@pytest.fixture(scope="session")
+def engine():
+    from database import engine
+    from migrate import upgrade
+
+    upgrade(engine, log=lambda message: None)
+    yield engine
+    engine.dispose()
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client(engine):
+    # One client for the session: shutdown stops the password hashing pool for good
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def user(client) -> str:
+    """A newly registered user, signed in on ``client``; returns the email."""
+    email = f"{uuid.uuid4()}@example.com"
+    response = client.post("/api/Auth/register", json={"Name": email, "Email": email, "Password": "password"})
+    assert response.status_code == 200, response.text
+    return email
+
+
+def make_resume_body(city: str, children: int = 0) -> dict:
+    return {
+        "title": "Resume", "isPublic": True, "lastName": "L", "firstName": "F",
+        "birthDate": "1990-01-01T00:00:00", "email": "e@example.com", "position": "Python developer",
+        "employment": "full", "workSchedule": "5/2", "city": city, "citizenship": "RU", "desiredSalary": 1000,
+        "workExperiences": [
+            {"organization": f"Org {i}", "workExpPosition": "Developer", "startDate": "2020-01-01T00:00:00",
+             "endDate": "2021-01-01T00:00:00", "responsibilities": "Python"}
+            for i in range(children)
+        ],
+        "educations": [
+            {"institution": f"University {i}", "faculty": "F", "specialty": "S", "graduationYear": 2010,
+             "studyForm": "full"}
+            for i in range(children)
+        ],
+    }
+
+
+@pytest.fixture
+def resume_body():
+    """``resume_body(city, children)``: a create-resume request with that many work experiences and educations."""
+    return make_resume_body
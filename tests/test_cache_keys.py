@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+import main
+
+ENDPOINTS = [
+    ("GET", "/api/Resume/{id}/pdf"),
+    ("GET", "/api/Resume/{id}/preview"),
+    ("POST", "/api/Resume/{id}/pdf/jobs"),
+]
+
+
+@pytest.mark.parametrize("method, path", ENDPOINTS)
+def test_cache_keys_are_computed_off_the_event_loop(client, user, resume_body, monkeypatch, method, path):
+    on_loop = []
+
+    def resume_cache_key(snapshot, style_name):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return "key"
+
+    async def render_cached(resume_id, snapshot, style_name, cache_key=None):
+        return b"%PDF-1.4"
+
+    async def preview_cached(resume_id, snapshot, style_name, width, fmt, key):
+        return b"image"
+
+    monkeypatch.setattr(main, "resume_cache_key", resume_cache_key)
+    monkeypatch.setattr(main, "render_cached", render_cached)
+    monkeypatch.setattr(main, "preview_cached", preview_cached)
+    resume_id = client.post("/api/Resume", json=resume_body("Kazan", children=0)).json()["id"]
+    response = client.request(method, path.format(id=resume_id))
+    assert response.status_code in (200, 202), response.text
+    assert on_loop == [False]
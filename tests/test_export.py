@@ -0,0 +1,32 @@
+import io
+import json
+import uuid
+import zipfile
+
+
+def export(client, **body):
+    response = client.post("/api/Resume/export", json=body)
+    assert response.status_code == 200, response.text
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    return response, archive, json.loads(archive.read("manifest.json"))
+
+
+def test_export_marks_truncation(client, user, resume_body, monkeypatch):
+    import export as export_module
+    import main
+
+    monkeypatch.setattr(main, "EXPORT_MAX_RESUMES", 2)
+    monkeypatch.setattr(export_module, "EXPORT_MAX_RESUMES", 2)
+    city = f"City {uuid.uuid4().hex}"
+    ids = sorted(client.post("/api/Resume", json=resume_body(city, children=0)).json()["id"] for _ in range(3))
+
+    response, archive, manifest = export(client, filter={"city": city, "onlyMine": True})
+    assert response.headers["x-export-truncated"] == "true"
+    assert manifest["truncated"] is True and manifest["limit"] == 2
+    # The first EXPORT_MAX_RESUMES by id, in the order their renders finished
+    assert sorted(item["id"] for item in manifest["resumes"]) == ids[:2]
+    assert len([name for name in archive.namelist() if name.endswith(".pdf")]) == 2
+
+    response, archive, manifest = export(client, ids=ids[:2])
+    assert "x-export-truncated" not in response.headers
+    assert manifest["truncated"] is False
@@ -0,0 +1,28 @@
+import uuid
+
+
+def test_filter_pages_through_resumes_with_and_without_a_salary(client, user, resume_body):
+    city = f"City {uuid.uuid4().hex}"
+    created = []
+    for salary in (None, 3000, None, 1000, 1000, None, 2000):
+        body = {**resume_body(city, children=0), "desiredSalary": salary}
+        created.append((salary, client.post("/api/Resume", json=body).json()["id"]))
+    expected = [resume_id for _, resume_id in sorted(created, key=lambda c: (c[0] is not None, c[0] or 0, c[1]))]
+
+    seen, cursor = [], None
+    while True:
+        params = {"city": city, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/Resume/filter", params=params)
+        assert response.status_code == 200, response.text
+        seen += [r["id"] for r in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == expected
+
+
+def test_filter_rejects_a_malformed_cursor(client, user):
+    response = client.get("/api/Resume/filter", params={"cursor": "1000"})
+    assert response.status_code == 400
@@ -0,0 +1,97 @@
+import datetime
+import threading
+
+import pytest
+from sqlalchemy import delete
+
+import jobs
+from database import PdfJob, SessionLocal
+
+
+@pytest.fixture
+def job_env(client, monkeypatch, tmp_path):
+    """No jobs left over from other tests, results under tmp_path and a stand-in renderer."""
+    with SessionLocal() as db:
+        db.execute(delete(PdfJob))
+        db.commit()
+    monkeypatch.setattr(jobs, "PDF_JOB_RESULT_DIR", str(tmp_path))
+    monkeypatch.setattr(jobs, "render_resume_pdf", lambda snapshot, theme: b"%PDF-1.4")
+    return tmp_path
+
+
+def create_job(client, resume_body):
+    resume_id = client.post("/api/Resume", json=resume_body("Kazan", children=1)).json()["id"]
+    response = client.post(f"/api/Resume/{resume_id}/pdf/jobs")
+    assert response.status_code == 202, response.text
+    return resume_id, response.json()["jobId"]
+
+
+def test_identical_requests_share_a_job(client, user, resume_body, job_env):
+    resume_id, job_id = create_job(client, resume_body)
+    assert client.post(f"/api/Resume/{resume_id}/pdf/jobs").json()["jobId"] == job_id
+    assert client.post(f"/api/Resume/{resume_id}/pdf/jobs", json={"theme": "classic"}).json()["jobId"] != job_id
+
+
+def test_a_job_is_claimed_once(client, user, resume_body, job_env):
+    _, job_id = create_job(client, resume_body)
+    with SessionLocal() as db:
+        job = jobs.claim_job(db)
+        assert job.id == job_id
+        assert (job.status, job.attempts) == ("running", 1)
+        assert jobs.claim_job(db) is None
+        jobs.process_job(db, job)
+    response = client.get(f"/api/PdfJobs/{job_id}")
+    assert response.json()["status"] == "done"
+    assert client.get(f"/api/PdfJobs/{job_id}/result").content == b"%PDF-1.4"
+
+
+def test_a_failed_render_is_retried_after_a_backoff(client, user, resume_body, job_env, monkeypatch):
+    def fail(snapshot, theme):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(jobs, "render_resume_pdf", fail)
+    _, job_id = create_job(client, resume_body)
+    with SessionLocal() as db:
+        jobs.process_job(db, jobs.claim_job(db))
+        job = db.get(PdfJob, job_id)
+        assert (job.status, job.attempts, job.error) == ("pending", 1, "RuntimeError: boom")
+        assert job.available_at > datetime.datetime.utcnow()
+        assert jobs.claim_job(db) is None
+
+        for attempt in range(2, jobs.PDF_JOB_MAX_ATTEMPTS + 1):
+            job.available_at = datetime.datetime.utcnow()
+            db.commit()
+            jobs.process_job(db, jobs.claim_job(db))
+            assert db.get(PdfJob, job_id).attempts == attempt
+        assert db.get(PdfJob, job_id).status == "failed"
+
+
+def test_a_resume_deleted_mid_render_drops_the_job(client, user, resume_body, job_env, monkeypatch):
+    resume_id, job_id = create_job(client, resume_body)
+
+    def render_while_deleted(snapshot, theme):
+        assert client.delete(f"/api/Resume/{resume_id}").status_code == 200
+        return b"%PDF-1.4"
+
+    monkeypatch.setattr(jobs, "render_resume_pdf", render_while_deleted)
+    with SessionLocal() as db:
+        jobs.process_job(db, jobs.claim_job(db))
+        assert db.get(PdfJob, job_id) is None
+    assert list(job_env.iterdir()) == []
+
+
+def test_the_worker_outlives_a_failing_job(client, user, resume_body, job_env, monkeypatch):
+    stop_event = threading.Event()
+    calls = []
+
+    def process_job(db, job):
+        calls.append(job.id)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        stop_event.set()
+
+    monkeypatch.setattr(jobs, "process_job", process_job)
+    create_job(client, resume_body)
+    create_job(client, resume_body)
+    jobs.run_worker(poll_interval=0.01, stop_event=stop_event)
+    assert len(calls) == 2
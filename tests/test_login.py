@@ -0,0 +1,53 @@
+import uuid
+
+from sqlalchemy import event, select
+
+from database import async_engine, async_write_engine, engine, User
+
+
+def test_login_releases_its_connection_during_bcrypt(client, monkeypatch):
+    import main
+
+    email = f"{uuid.uuid4()}@example.com"
+    client.post("/api/Auth/register", json={"Name": email, "Email": email, "Password": "password"})
+    checked_out = []
+    verify_and_update = main.password_hasher.verify_and_update
+
+    async def spy(password, password_hash):
+        checked_out.append(async_engine.pool.checkedout())
+        return await verify_and_update(password, password_hash)
+
+    monkeypatch.setattr(main.password_hasher, "verify_and_update", spy)
+    response = client.post("/api/Auth/login", json={"Login": email, "Password": "password"})
+    assert response.status_code == 200, response.text
+    assert response.json()["user"]["email"] == email
+    assert checked_out == [0]
+
+    response = client.post("/api/Auth/login", json={"Login": email, "Password": "wrong"})
+    assert response.status_code == 401
+
+
+def test_login_rehash_goes_through_the_write_engine(client, monkeypatch):
+    import main
+
+    email = f"{uuid.uuid4()}@example.com"
+    client.post("/api/Auth/register", json={"Name": email, "Email": email, "Password": "password"})
+
+    async def rehash(password, password_hash):
+        return True, "rehashed"
+
+    writes = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        writes.append(statement)
+
+    monkeypatch.setattr(main.password_hasher, "verify_and_update", rehash)
+    event.listen(async_write_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.post("/api/Auth/login", json={"Login": email, "Password": "password"})
+    finally:
+        event.remove(async_write_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200, response.text
+    assert any(statement.startswith("UPDATE users") for statement in writes), writes
+    with engine.connect() as conn:
+        assert conn.scalar(select(User.password_hash).where(User.email == email)) == "rehashed"
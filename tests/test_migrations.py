@@ -0,0 +1,49 @@
+import datetime
+
+import pytest
+from sqlalchemy import DateTime, bindparam, create_engine, text
+
+from migrate import upgrade
+
+
+@pytest.fixture
+def bind(tmp_path):
+    bind = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield bind
+    bind.dispose()
+
+
+def insert_resume(bind, resume_id):
+    with bind.begin() as conn:
+        conn.execute(text("INSERT OR IGNORE INTO users (id, email) VALUES ('u', 'u@example.com')"))
+        conn.execute(text(
+            "INSERT INTO resumes (id, user_id, \"lastName\", \"firstName\", \"birthDate\", email, position, employment,"
+            " \"workSchedule\", city, citizenship, \"isPublic\")"
+            " VALUES (:id, 'u', 'L', 'F', '1990-01-01 00:00:00.000000', 'e@example.com', 'Python developer', 'full',"
+            " '5/2', 'Kazan', 'RU', 1)"
+        ), {"id": resume_id})
+
+
+def test_existing_resumes_get_created_at_without_the_backfill(bind):
+    upgrade(bind, target=4, run_backfills=False, log=lambda message: None)
+    insert_resume(bind, "a")
+    insert_resume(bind, "b")
+    upgrade(bind, run_backfills=False, log=lambda message: None)
+    with bind.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM resumes WHERE created_at IS NULL")).scalar() == 0
+        # The /my cursor compares against a bound datetime
+        after_a = conn.scalars(
+            text("SELECT id FROM resumes WHERE (created_at, id) > (:created_at, 'a')")
+            .bindparams(bindparam("created_at", type_=DateTime)),
+            {"created_at": datetime.datetime(1970, 1, 1)},
+        ).all()
+    assert after_a == ["b"]
+
+
+def test_search_backfill_reads_the_schema_of_its_time(bind):
+    upgrade(bind, target=2, log=lambda message: None)
+    insert_resume(bind, "a")
+    upgrade(bind, target=3, log=lambda message: None)
+    with bind.connect() as conn:
+        assert conn.execute(text("SELECT resume_id FROM resume_search_rows")).scalars().all() == ["a"]
+        assert conn.execute(text("SELECT backfilled_at IS NOT NULL FROM schema_migrations WHERE version = 3")).scalar()
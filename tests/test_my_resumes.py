@@ -0,0 +1,29 @@
+def test_without_limit_or_cursor_every_resume_is_returned(client, user, resume_body):
+    for _ in range(3):
+        client.post("/api/Resume", json=resume_body("Kazan", children=0))
+    response = client.get("/api/Resume/my?view=summary")
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 3
+    assert "x-next-cursor" not in response.headers
+
+
+def test_pages_follow_the_cursor_in_creation_order(client, user, resume_body):
+    created = [client.post("/api/Resume", json=resume_body("Kazan", children=0)).json()["id"] for _ in range(5)]
+    seen, cursor = [], None
+    while True:
+        params = {"view": "summary", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/Resume/my", params=params)
+        assert response.status_code == 200, response.text
+        seen += [resume["id"] for resume in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert seen == created
+    unpaged = client.get("/api/Resume/my", params={"view": "summary"}).json()
+    assert [resume["id"] for resume in unpaged] == created
+
+
+def test_invalid_cursor(client, user):
+    assert client.get("/api/Resume/my", params={"cursor": "not-a-cursor"}).status_code == 400
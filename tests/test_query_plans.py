@@ -0,0 +1,11 @@
+import pytest
+
+from scripts.explain_queries import queries, query_plan, plan_problems
+
+
+@pytest.mark.parametrize("name, query", list(queries()), ids=lambda value: value if isinstance(value, str) else "")
+def test_query_reads_in_index_order(engine, name, query):
+    with engine.connect() as conn:
+        plan = query_plan(conn, query)
+    assert any("USING" in line and "INDEX" in line for line in plan), plan
+    assert plan_problems(plan) == [], plan
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+import pytest
+
+from render_pool import RenderPool, RenderQueueFull, RenderTimeout
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_time_in_the_queue_does_not_count_against_the_timeout():
+    pool = RenderPool(size=1, queue_depth=4, timeout=1)
+
+    async def burst():
+        return await asyncio.gather(*(pool.run(time.sleep, 0.6) for _ in range(4)), return_exceptions=True)
+
+    try:
+        assert run(burst()) == [None] * 4
+        assert pool.in_flight == 0
+    finally:
+        pool.shutdown()
+
+
+def test_a_stuck_job_times_out_and_the_pool_recovers():
+    pool = RenderPool(size=1, queue_depth=1, timeout=0.5)
+
+    async def stuck_then_quick():
+        with pytest.raises(RenderTimeout):
+            await pool.run(time.sleep, 30)
+        return await pool.run(abs, -1)
+
+    try:
+        assert run(stuck_then_quick()) == 1
+        assert pool.in_flight == 0
+    finally:
+        pool.shutdown()
+
+
+def test_jobs_beyond_the_queue_are_rejected():
+    pool = RenderPool(size=1, queue_depth=1, timeout=5)
+
+    async def overflow():
+        return await asyncio.gather(*(pool.run(time.sleep, 0.3) for _ in range(3)), return_exceptions=True)
+
+    try:
+        results = run(overflow())
+        assert sum(isinstance(result, RenderQueueFull) for result in results) == 1
+    finally:
+        pool.shutdown()
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import shutil
+
+import pytest
+from sqlalchemy import select
+
+from database import User
+from replicas import ReadReplicas
+
+
+@pytest.fixture
+def replica_file(engine, tmp_path):
+    path = tmp_path / "replica.db"
+    primary = engine.url.database
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    shutil.copyfile(primary, path)
+    return str(path)
+
+
+def replica_url(path: str) -> str:
+    return f"sqlite:///file:{path}?mode=ro&uri=true"
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_session_without_queries_never_connects(replica_file):
+    replicas = ReadReplicas([replica_url(replica_file)])
+
+    async def unused_session():
+        async with replicas.session():
+            pass
+        await replicas.dispose()
+
+    run(unused_session())
+    stats = replicas.stats()
+    assert stats["replicas"][0]["served"] == 0
+    assert stats["primaryFallbacks"] == 0
+
+
+def test_queries_go_to_a_replica(replica_file):
+    replicas = ReadReplicas([replica_url(replica_file)])
+
+    async def query():
+        async with replicas.session() as db:
+            await db.scalar(select(User.id).limit(1))
+            await db.scalar(select(User.id).limit(1))
+            checked_out = replicas.replicas[0].engine.pool.checkedout()
+        await replicas.dispose()
+        return checked_out
+
+    assert run(query()) == 1
+    assert replicas.stats()["replicas"][0]["served"] == 1
+    assert replicas.replicas[0].engine.pool.checkedout() == 0
+
+
+def test_dead_replica_falls_back_to_the_primary(tmp_path):
+    replicas = ReadReplicas([replica_url(os.path.join(tmp_path, "missing.db"))], retry_interval=60)
+
+    async def query():
+        async with replicas.session() as db:
+            await db.scalar(select(User.id).limit(1))
+        await replicas.dispose()
+
+    run(query())
+    stats = replicas.stats()
+    assert not stats["replicas"][0]["healthy"]
+    assert stats["replicas"][0]["failures"] == 1
+    assert stats["primaryFallbacks"] == 1
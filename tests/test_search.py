@@ -0,0 +1,23 @@
+import uuid
+
+
+def test_search_pages_through_every_hit(client, user, resume_body):
+    city = f"City {uuid.uuid4().hex}"
+    created = {client.post("/api/Resume", json=resume_body(city, children=1)).json()["id"] for _ in range(7)}
+    seen, cursor = [], None
+    while True:
+        params = {"q": "python", "city": city, "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/Resume/search", params=params)
+        assert response.status_code == 200, response.text
+        seen += [hit["id"] for hit in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert len(seen) == len(created) and set(seen) == created
+
+
+def test_search_rejects_a_malformed_cursor(client, user):
+    response = client.get("/api/Resume/search", params={"q": "python", "cursor": "12"})
+    assert response.status_code == 400
@@ -0,0 +1,37 @@
+"""Readers don't wait for an open write transaction (see scripts/sqlite_concurrency.py for the load check)."""
+import asyncio
+import time
+
+from sqlalchemy import select, text
+
+from database import AsyncSessionLocal, AsyncWriteSessionLocal, SQLITE_PRAGMAS, User
+
+READ_TIMEOUT = 1
+
+
+async def read_emails():
+    async with AsyncSessionLocal() as db:
+        return set((await db.scalars(select(User.email))).all())
+
+
+async def read_while_writing():
+    async with AsyncWriteSessionLocal() as db:
+        # Make the transaction spill pages to disk before commit, as a large write does; without
+        # WAL that takes an exclusive lock on the whole file
+        await db.execute(text("PRAGMA cache_size = 16"))
+        db.add(User(name="holder", email="uncommitted@example.com"))
+        db.add_all(User(name="holder", email=f"bulk-{i}@example.com", password_hash="x" * 200) for i in range(2000))
+        await db.flush()
+        try:
+            start = time.perf_counter()
+            emails = await asyncio.wait_for(read_emails(), READ_TIMEOUT)
+            return emails, time.perf_counter() - start
+        finally:
+            await db.rollback()
+            await db.execute(text(f"PRAGMA cache_size = {SQLITE_PRAGMAS.get('cache_size', -2000)}"))
+
+
+def test_reads_run_while_a_write_transaction_is_open(engine):
+    emails, elapsed = asyncio.run(read_while_writing())
+    assert elapsed < READ_TIMEOUT
+    assert "uncommitted@example.com" not in emails
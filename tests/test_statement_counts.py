@@ -0,0 +1,66 @@
+"""The list endpoints run the same number of SQL statements however many rows they return."""
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from database import async_engine, async_write_engine, engine
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = [async_engine.sync_engine, async_write_engine.sync_engine, engine]
+    for target in engines:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+def statements_for(client, method: str, path: str, **kwargs) -> list:
+    with count_statements() as statements:
+        response = client.request(method, path, **kwargs)
+    assert response.status_code == 200, response.text
+    return statements
+
+
+LIST_ENDPOINTS = [
+    "/api/Resume/my",
+    "/api/Resume/my?view=summary",
+    "/api/Resume/my?fields=title,workExperiences",
+    "/api/Resume/search?q=python&city={city}",
+    "/api/Resume/filter?city={city}",
+]
+
+
+@pytest.mark.parametrize("path", LIST_ENDPOINTS)
+def test_list_endpoints_have_no_n_plus_one(client, user, resume_body, path):
+    city = f"City {uuid.uuid4().hex}"
+    path = path.format(city=city)
+    for _ in range(2):
+        client.post("/api/Resume", json=resume_body(city, children=2))
+    client.get(path)  # the first request also fills the user cache
+    few = statements_for(client, "GET", path)
+    for _ in range(5):
+        client.post("/api/Resume", json=resume_body(city, children=2))
+    many = statements_for(client, "GET", path)
+    assert len(client.get(path).json()) == 7
+    assert len(many) == len(few), many
+
+
+@pytest.mark.parametrize("method", ["POST", "PUT"])
+def test_resume_detail_does_not_query_per_child(client, user, resume_body, method):
+    city = f"City {uuid.uuid4().hex}"
+    resume_id = client.post("/api/Resume", json=resume_body(city, children=1)).json()["id"]
+    path = "/api/Resume" if method == "POST" else f"/api/Resume/{resume_id}"
+    few = statements_for(client, method, path, json=resume_body(city, children=1))
+    many = statements_for(client, method, path, json=resume_body(city, children=6))
+    assert len(many) == len(few), many
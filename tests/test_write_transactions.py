@@ -0,0 +1,53 @@
+"""Write handlers use one write transaction and don't start another to build their response.
+
+On SQLite every write transaction holds the database's write lock (BEGIN IMMEDIATE),
+so a read after the commit would take the lock again for nothing.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from database import async_write_engine
+
+
+@pytest.fixture
+def write_transactions():
+    transactions = []
+
+    def on_begin(conn):
+        transactions.append("begin")
+
+    def on_commit(conn):
+        transactions.append("commit")
+
+    engine = async_write_engine.sync_engine
+    event.listen(engine, "begin", on_begin)
+    event.listen(engine, "commit", on_commit)
+    yield transactions
+    event.remove(engine, "begin", on_begin)
+    event.remove(engine, "commit", on_commit)
+
+
+def test_register_uses_one_write_transaction(client, write_transactions):
+    email = f"{uuid.uuid4()}@example.com"
+    response = client.post("/api/Auth/register", json={"Name": email, "Email": email, "Password": "password"})
+    assert response.status_code == 200, response.text
+    assert response.json()["user"]["email"] == email
+    assert write_transactions == ["begin", "commit"]
+
+
+def test_create_and_update_use_one_write_transaction(client, user, resume_body, write_transactions):
+    response = client.post("/api/Resume", json=resume_body("Moscow", children=2))
+    assert response.status_code == 200, response.text
+    created = response.json()
+    assert len(created["workExperiences"]) == 2 and len(created["educations"]) == 2
+    assert write_transactions == ["begin", "commit"]
+
+    write_transactions.clear()
+    response = client.put(f"/api/Resume/{created['id']}", json={"title": "Renamed"})
+    assert response.status_code == 200, response.text
+    updated = response.json()
+    assert updated["title"] == "Renamed"
+    assert updated["workExperiences"] == created["workExperiences"]
+    assert write_transactions == ["begin", "commit"]
@@ -0,0 +1,88 @@
+from reportlab.pdfbase import pdfmetrics
+
+# Memoized word widths per font/size; resumes reuse a small vocabulary, so
+# this stays small, but it is capped in case of pathological input.
+MAX_MEMOIZED_WORDS = 20000
+
+
+class TextMeasurer:
+    """Measures text in one font at one size.
+
+    Glyph widths come from ``pdfmetrics.stringWidth`` once per character and
+    word widths are memoized, so laying out a resume measures each distinct
+    word only once.
+    """
+
+    def __init__(self, font_name: str, size: float):
+        self.font_name = font_name
+        self.size = size
+        self._glyphs = {}
+        self._words = {}
+        self.space_width = self.glyph_width(" ")
+
+    def glyph_width(self, char: str) -> float:
+        width = self._glyphs.get(char)
+        if width is None:
+            width = pdfmetrics.stringWidth(char, self.font_name, self.size)
+            self._glyphs[char] = width
+        return width
+
+    def word_width(self, word: str) -> float:
+        width = self._words.get(word)
+        if width is None:
+            width = sum(self.glyph_width(ch) for ch in word)
+            if len(self._words) < MAX_MEMOIZED_WORDS:
+                self._words[word] = width
+        return width
+
+    def width(self, text: str) -> float:
+        words = text.split(" ")
+        return sum(self.word_width(w) for w in words) + self.space_width * (len(words) - 1)
+
+    def wrap(self, text: str, max_width: float) -> list:
+        """Greedy line breaking on spaces; words wider than a line are split by character."""
+        lines = []
+        for paragraph in text.splitlines() or [""]:
+            line, line_width = [], 0.0
+            for word in paragraph.split():
+                w = self.word_width(word)
+                extra = w + (self.space_width if line else 0)
+                if line and line_width + extra > max_width:
+                    lines.append(" ".join(line))
+                    line, line_width = [], 0.0
+                    extra = w
+                if w > max_width:
+                    chunks = list(self._split_word(word, max_width))
+                    lines.extend(chunks[:-1])
+                    line, line_width = [chunks[-1]], self.word_width(chunks[-1])
+                    continue
+                line.append(word)
+                line_width += extra
+            lines.append(" ".join(line))
+        return lines
+
+    def _split_word(self, word: str, max_width: float):
+        chunk, chunk_width = "", 0.0
+        for ch in word:
+            w = self.glyph_width(ch)
+            if chunk and chunk_width + w > max_width:
+                yield chunk
+                chunk, chunk_width = "", 0.0
+            chunk += ch
+            chunk_width += w
+        yield chunk
+
+
+_measurers = {}
+
+
+def get_measurer(font_name: str, size: float) -> TextMeasurer:
+    measurer = _measurers.get((font_name, size))
+    if measurer is None:
+        measurer = TextMeasurer(font_name, size)
+        _measurers[(font_name, size)] = measurer
+    return measurer
+
+
+def wrap_text(text: str, font_name: str, size: float, max_width: float) -> list:
+    return get_measurer(font_name, size).wrap(text, max_width)